@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+파싱 벤치마크 (전체 문서 vs 상품 목록 영역만)
+저장된 페이지를 주면 그 페이지로, 없으면 합성 페이지로 백엔드별 시간과 메모리를 측정합니다.
+
+사용법:
+    python bench_parse.py                         # 사이트별 합성 페이지
+    python bench_parse.py yes24 saved_yes24.html  # 저장된 페이지
+"""
+
+import json
+import sys
+import time
+import tracemalloc
+
+from monitor_actions import parse_aladin_products, parse_ktown4u_products, parse_yes24_products
+from parsers import available_backends
+
+PARSE_FUNCS = {
+    "yes24": parse_yes24_products,
+    "aladin": parse_aladin_products,
+    "ktown4u": parse_ktown4u_products,
+}
+
+# 헤더/푸터/스크립트/추천 위젯 등 실제 페이지의 목록 밖 영역을 흉내 낸 분량
+NOISE_BLOCKS = 1500
+
+
+def page_noise(tag):
+    scripts = "".join(
+        f"<script>window.__data{i} = {json.dumps({'k': list(range(20))})};</script>" for i in range(NOISE_BLOCKS // 10)
+    )
+    links = "".join(f'<li><a href="/menu/{i}" class="nav">메뉴 {i}</a></li>' for i in range(NOISE_BLOCKS))
+    return f'<div id="{tag}">{scripts}<ul>{links}</ul></div>'
+
+
+def synthetic_page(site_key, count=120):
+    """사이트별 합성 목록 페이지"""
+    items = []
+    for i in range(count):
+        if site_key == "yes24":
+            opt = json.dumps({"salePrice": 40000 + i * 100}).replace('"', "&quot;")
+            items.append(
+                f'<li data-goods-no="{170000000 + i}"><img data-original="//image.yes24.com/goods/{i}/L">'
+                f'<a class="gd_name" href="/Product/Goods/{i}">아티스트 {i} - 앨범 [컬러 LP]</a>'
+                f'<em class="yes_b">{40000 + i * 100:,}</em>'
+                f'<input type="hidden" name="ORD_GOODS_OPT" value="{opt}">'
+                f'{"<span class=txt_soldout>품절</span>" if i % 7 == 0 else "<button>카트</button>"}</li>'
+            )
+        elif site_key == "aladin":
+            items.append(
+                f'<div class="ss_book_box"><table><tr><td>'
+                f'<img src="https://image.aladin.co.kr/product/{i}/coversum/{i}.jpg"></td><td>'
+                f'<a href="/shop/wproduct.aspx?ItemId={380000000 + i}" class="bo3"><b>LP 앨범 {i}</b></a>'
+                f'<span class="ss_p2">{30000 + i:,}원</span>{"품절" if i % 5 == 0 else ""}</td></tr></table></div>'
+            )
+        else:
+            items.append(
+                f'<a href="/iteminfo?goods_no={150000 + i}"><img src="https://x/thumbnail/{i}.jpg" alt="Artist {i} LP">'
+                f'<span>KRW {12000 + i:,}</span>{"<em>품절</em>" if i % 6 == 0 else ""}</a>'
+            )
+    wrapper = "ul" if site_key == "yes24" else "div"
+    return (
+        f"<html><head>{page_noise('head')}</head><body>{page_noise('header')}"
+        f"<{wrapper} id='list'>{''.join(items)}</{wrapper}>{page_noise('footer')}</body></html>"
+    )
+
+
+def measure(parse_func, html, backend, scoped, repeat=5):
+    """평균 파싱 시간(ms)과 파이썬 힙 최대 사용량(KB)"""
+    tracemalloc.start()
+    result = parse_func(html, backend=backend, scoped=scoped)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    started = time.perf_counter()
+    for _ in range(repeat):
+        parse_func(html, backend=backend, scoped=scoped)
+    elapsed = (time.perf_counter() - started) / repeat
+    return result, elapsed * 1000, peak / 1024
+
+
+def bench(site_key, html):
+    parse_func = PARSE_FUNCS[site_key]
+    print(f"\n[{site_key}] 페이지 크기 {len(html) / 1024:.0f}KB")
+    print(f"{'백엔드':<12}{'전체(ms)':>10}{'영역(ms)':>10}{'전체 힙(KB)':>14}{'영역 힙(KB)':>14}  결과")
+
+    for backend in available_backends():
+        full, full_ms, full_kb = measure(parse_func, html, backend, scoped=False)
+        scoped, scoped_ms, scoped_kb = measure(parse_func, html, backend, scoped=True)
+        status = "일치" if full == scoped else "불일치"
+        print(f"{backend:<12}{full_ms:>10.1f}{scoped_ms:>10.1f}{full_kb:>14.0f}{scoped_kb:>14.0f}  {status} ({len(scoped)}개)")
+
+
+def main():
+    if len(sys.argv) == 3:
+        with open(sys.argv[2], "r", encoding="utf-8") as f:
+            bench(sys.argv[1], f.read())
+        return
+
+    for site_key in PARSE_FUNCS:
+        bench(site_key, synthetic_page(site_key))
+    print("\n* 힙 사용량은 tracemalloc 기준으로 파이썬 객체만 집계합니다 (lxml/selectolax의 C 메모리는 제외).")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+상품 목록 저장 형식 벤치마크
+합성 상품 목록(1천/1만/10만 개)으로 스냅샷 형식별 저장/불러오기 시간과 파일 크기를,
+SQLite 저장소는 전체 가져오기와 변경 10개 저장 시간을 측정합니다.
+
+사용법:
+    python bench_store.py              # 1000 10000 100000
+    python bench_store.py 5000 50000   # 크기 지정
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+import snapshot
+from store import ProductStore
+
+SITE_KEYS = ["yes24", "aladin", "ktown4u"]
+DEFAULT_SIZES = [1000, 10000, 100000]
+
+
+def synthetic_products(count):
+    """사이트별로 나눈 합성 상품 목록"""
+    data = {site: {} for site in SITE_KEYS}
+    for i in range(count):
+        site = SITE_KEYS[i % len(SITE_KEYS)]
+        pid = str(100000000 + i)
+        data[site][pid] = {
+            "title": f"아티스트 {i} - 앨범 타이틀 {i % 997} [180g 컬러 LP]",
+            "url": f"https://www.example.com/{site}/product/{pid}",
+            "price": f"{random.randint(20, 90) * 1000:,}원",
+            "image": f"https://image.example.com/{site}/{pid}/cover.jpg",
+            "soldout": random.random() < 0.3,
+        }
+    return data
+
+
+def timed(func, repeat=3):
+    """최소 실행 시간(ms)과 마지막 결과"""
+    best, result = None, None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        elapsed = (time.perf_counter() - started) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def bench_snapshots(data, directory):
+    for fmt in snapshot.available_formats():
+        path = os.path.join(directory, f"products.{fmt}")
+        save_ms, _ = timed(lambda: snapshot.save(path, data, fmt))
+        load_ms, loaded = timed(lambda: snapshot.load(path))
+        status = "" if loaded == data else "  (불일치!)"
+        size_kb = os.path.getsize(path) / 1024
+        print(f"{fmt:<14}{save_ms:>12.1f}{load_ms:>12.1f}{size_kb:>14.0f}{status}")
+
+
+def bench_sqlite(data, directory):
+    path = os.path.join(directory, "products.db")
+    store = ProductStore(path)
+    import_ms, _ = timed(lambda: store.import_data(data), repeat=1)
+
+    # 사이클 하나에서 바뀌는 정도의 변경분 저장
+    site = SITE_KEYS[0]
+    saved = store.load(SITE_KEYS)
+    changed_ids = random.sample(list(data[site]), 10)
+
+    def save_changes():
+        for pid in changed_ids:
+            record = dict(saved[site][pid])
+            record["soldout"] = not record["soldout"]
+            saved[site][pid] = record
+        return store.save(saved)
+
+    save_ms, _ = timed(save_changes)
+    lookup_ms, _ = timed(lambda: [pid in store.load(SITE_KEYS)[site] for pid in changed_ids])
+    store.close()
+    size_kb = os.path.getsize(path) / 1024
+    print(f"{'sqlite':<14}{save_ms:>12.1f}{lookup_ms:>12.1f}{size_kb:>14.0f}"
+          f"  (저장=변경 10개, 불러오기=10개 조회, 최초 가져오기 {import_ms:.0f}ms)")
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES
+    missing = [fmt for fmt in snapshot.FORMATS if not snapshot.is_available(fmt)]
+    if missing:
+        print(f"* 설치되지 않아 건너뜀: {', '.join(missing)} (pip install msgpack zstandard)")
+
+    for count in sizes:
+        data = synthetic_products(count)
+        print(f"\n[{count:,}개]")
+        print(f"{'형식':<14}{'저장(ms)':>12}{'불러오기(ms)':>12}{'크기(KB)':>14}")
+        with tempfile.TemporaryDirectory() as directory:
+            bench_snapshots(data, directory)
+            bench_sqlite(data, directory)
+
+
+if __name__ == "__main__":
+    main()
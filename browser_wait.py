@@ -0,0 +1,158 @@
+"""
+브라우저 대기 유틸리티
+고정 sleep 대신 페이지 안에서 MutationObserver로 목록이 다시 그려지는 순간을 감지합니다.
+대기 함수는 실제 대기 시간(elapsed_ms)을 포함한 결과 dict를 반환합니다.
+"""
+
+# 공통: 대상 항목이 추가되면 rendered, 이후 quietMs 동안 변화가 없으면 done(결과) 호출
+_OBSERVER_JS = """
+function lpWatch(itemSelector, maxWait, quietMs, done) {
+    var start = performance.now();
+    var rendered = false, finished = false, quietTimer = null, maxTimer = null;
+
+    function firstId() {
+        var el = document.querySelector(itemSelector);
+        return el ? (el.getAttribute("data-goods-no") || el.getAttribute("href")) : null;
+    }
+
+    var oldId = firstId();
+
+    function finish(status) {
+        if (finished) return;
+        finished = true;
+        observer.disconnect();
+        clearTimeout(quietTimer);
+        clearTimeout(maxTimer);
+        done({
+            status: status,
+            old_id: oldId,
+            new_id: firstId(),
+            count: document.querySelectorAll(itemSelector).length,
+            elapsed_ms: Math.round(performance.now() - start)
+        });
+    }
+
+    function touchesItems(mutation) {
+        for (var i = 0; i < mutation.addedNodes.length; i++) {
+            var node = mutation.addedNodes[i];
+            if (node.nodeType !== 1) continue;
+            if (node.matches(itemSelector) || node.querySelector(itemSelector)) return true;
+        }
+        return false;
+    }
+
+    var observer = new MutationObserver(function (mutations) {
+        if (!rendered) {
+            if (!mutations.some(touchesItems)) return;
+            rendered = true;
+        }
+        clearTimeout(quietTimer);
+        quietTimer = setTimeout(function () { finish("changed"); }, quietMs);
+    });
+    observer.observe(document.body, {childList: true, subtree: true});
+    maxTimer = setTimeout(function () { finish(rendered ? "changed" : "timeout"); }, maxWait);
+    return finish;
+}
+"""
+
+_CLICK_JS = _OBSERVER_JS + """
+var finish = lpWatch(arguments[0], arguments[1], arguments[2], arguments[arguments.length - 1]);
+var btn = document.querySelector(arguments[3]);
+if (btn) {
+    btn.click();
+} else {
+    finish("no_button");
+}
+"""
+
+# 클릭만 하고 바로 반환, 결과는 window.__lpWait(Promise)에 보관 (탭 여러 개를 동시에 진행할 때)
+_START_CLICK_JS = _OBSERVER_JS + """
+var args = arguments;
+window.__lpWait = new Promise(function (resolve) {
+    var finish = lpWatch(args[0], args[1], args[2], resolve);
+    var btn = document.querySelector(args[3]);
+    if (btn) {
+        btn.click();
+    } else {
+        finish("no_button");
+    }
+});
+return true;
+"""
+
+_COLLECT_JS = """
+var done = arguments[arguments.length - 1];
+if (window.__lpWait) {
+    window.__lpWait.then(done);
+} else {
+    done({status: "not_started", elapsed_ms: 0});
+}
+"""
+
+_SCROLL_JS = _OBSERVER_JS + """
+lpWatch(arguments[0], arguments[1], arguments[2], arguments[arguments.length - 1]);
+window.scrollTo(0, document.body.scrollHeight);
+"""
+
+# 변화가 없는 상태가 quietMs 동안 이어지면 완료 (로드 직후 안정화 대기용)
+_QUIET_JS = """
+var quietMs = arguments[0], maxWait = arguments[1];
+var done = arguments[arguments.length - 1];
+var start = performance.now();
+var finished = false, quietTimer = null, maxTimer = null;
+
+function finish(status) {
+    if (finished) return;
+    finished = true;
+    observer.disconnect();
+    clearTimeout(quietTimer);
+    clearTimeout(maxTimer);
+    done({status: status, elapsed_ms: Math.round(performance.now() - start)});
+}
+
+function arm() {
+    clearTimeout(quietTimer);
+    quietTimer = setTimeout(function () { finish("quiet"); }, quietMs);
+}
+
+var observer = new MutationObserver(arm);
+observer.observe(document.body, {childList: true, subtree: true, attributes: true});
+maxTimer = setTimeout(function () { finish("timeout"); }, maxWait);
+arm();
+"""
+
+
+def _run(driver, script, *args, max_wait):
+    # 스크립트 타임아웃이 페이지 내부 타이머보다 짧으면 Selenium이 먼저 끊어버림
+    # 드라이버는 풀에서 재사용되므로 끝나면 원래 값(DriverPool의 script_timeout)으로 되돌림
+    previous = driver.timeouts.script
+    driver.set_script_timeout(max(previous, max_wait / 1000 + 5))
+    try:
+        return driver.execute_async_script(script, *args)
+    finally:
+        driver.set_script_timeout(previous)
+
+
+def click_and_wait_for_rerender(driver, click_selector, item_selector, max_wait=10000, quiet_ms=300):
+    """버튼 클릭 후 목록 항목이 다시 그려지고 잠잠해질 때까지 대기"""
+    return _run(driver, _CLICK_JS, item_selector, max_wait, quiet_ms, click_selector, max_wait=max_wait)
+
+
+def start_click_watch(driver, click_selector, item_selector, max_wait=10000, quiet_ms=300):
+    """버튼 클릭만 하고 반환 (결과는 collect_click_watch로 수집)"""
+    driver.execute_script(_START_CLICK_JS, item_selector, max_wait, quiet_ms, click_selector)
+
+
+def collect_click_watch(driver, max_wait=10000):
+    """start_click_watch로 시작한 대기의 결과 수집"""
+    return _run(driver, _COLLECT_JS, max_wait=max_wait)
+
+
+def scroll_and_wait_for_items(driver, item_selector, max_wait=3000, quiet_ms=300):
+    """맨 아래로 스크롤 후 추가 항목이 그려질 때까지 대기 (추가가 없으면 timeout)"""
+    return _run(driver, _SCROLL_JS, item_selector, max_wait, quiet_ms, max_wait=max_wait)
+
+
+def wait_for_dom_quiet(driver, quiet_ms=300, max_wait=5000):
+    """DOM 변경이 quiet_ms 동안 없을 때까지 대기"""
+    return _run(driver, _QUIET_JS, quiet_ms, max_wait, max_wait=max_wait)
@@ -0,0 +1,61 @@
+"""
+상품 변경 감지
+저장된 상품과 이번 사이클에 병합한 사이트 스냅샷을 한 번에 비교해
+신상품 / 재입고 / 품절 / 가격 변경 이벤트를 만듭니다.
+사이트마다 정렬·페이지를 모두 병합한 뒤 한 번만 비교하므로 상품당 같은 종류의 이벤트는 최대 한 번입니다.
+"""
+
+from collections import namedtuple
+from enum import Enum
+
+
+class EventType(Enum):
+    NEW = "new"
+    RESTOCK = "restock"
+    SOLDOUT = "soldout"
+    PRICE = "price"
+
+
+# previous: 저장돼 있던 레코드 (신상품이면 None)
+Event = namedtuple("Event", ["type", "site", "product_id", "product", "previous"])
+
+EVENT_LABELS = {
+    EventType.NEW: "신상품",
+    EventType.RESTOCK: "재입고",
+    EventType.SOLDOUT: "품절",
+    EventType.PRICE: "가격 변경",
+}
+
+
+def diff_site(site, saved, current):
+    """저장된 상품(saved)과 현재 스냅샷(current) 비교 → 이벤트 목록 (current 순서)"""
+    events = []
+    for pid, product in current.items():
+        previous = saved.get(pid)
+        if previous is None:
+            events.append(Event(EventType.NEW, site, pid, product, None))
+            continue
+
+        if previous.soldout and not product.soldout:
+            events.append(Event(EventType.RESTOCK, site, pid, product, previous))
+        elif product.soldout and not previous.soldout:
+            events.append(Event(EventType.SOLDOUT, site, pid, product, previous))
+
+        if previous.price is not None and product.price is not None and previous.price != product.price:
+            events.append(Event(EventType.PRICE, site, pid, product, previous))
+    return events
+
+
+def group_events(events):
+    """{이벤트 종류: {상품 ID: 상품}}"""
+    grouped = {event_type: {} for event_type in EventType}
+    for event in events:
+        grouped[event.type][event.product_id] = event.product
+    return grouped
+
+
+def summarize(events):
+    counts = {event_type: 0 for event_type in EventType}
+    for event in events:
+        counts[event.type] += 1
+    return ", ".join(f"{EVENT_LABELS[event_type]} {count}" for event_type, count in counts.items())
@@ -0,0 +1,175 @@
+"""
+WebDriver 풀
+헤드리스 Chrome 인스턴스는 처음 빌릴 때 띄우고, 반납된 드라이버는 풀에 남겨 두었다가 살아있는지 확인한 뒤 재사용합니다.
+죽거나 응답이 없는 드라이버는 폐기하고 새로 띄웁니다.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+
+def run_with_timeout(func, timeout):
+    """별도 스레드에서 func 실행, (완료 여부, 결과, 예외) 반환"""
+    holder = {}
+
+    def target():
+        try:
+            holder["result"] = func()
+        except Exception as e:
+            holder["error"] = e
+
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    thread.join(timeout)
+    if thread.is_alive():
+        return False, None, None
+    return True, holder.get("result"), holder.get("error")
+
+
+class DriverPool:
+    """헤드리스 Chrome 드라이버 풀"""
+
+    def __init__(self, factory, size=1, page_load_timeout=30, script_timeout=30, health_timeout=5):
+        self.factory = factory
+        self.size = max(1, size)
+        self.page_load_timeout = page_load_timeout
+        self.script_timeout = script_timeout
+        self.health_timeout = health_timeout
+        self.stats = {"created": 0, "replaced": 0, "failed": 0}
+
+        self._cond = threading.Condition()
+        self._idle = []
+        self._live = 0  # 대기 + 대여 중 + 기동 중
+        self._closed = False
+
+    def _launch(self):
+        """드라이버 생성 및 타임아웃 설정"""
+        started = time.time()
+        driver = self.factory()
+        # 멈춘 페이지가 사이클 전체를 붙잡지 않도록 타임아웃 지정
+        driver.set_page_load_timeout(self.page_load_timeout)
+        driver.set_script_timeout(self.script_timeout)
+        self.stats["created"] += 1
+        print(f"[{datetime.now()}] [드라이버] Chrome 기동 완료 ({time.time() - started:.1f}초)")
+        return driver
+
+    def _warm_one(self):
+        try:
+            driver = self._launch()
+        except Exception as e:
+            self.stats["failed"] += 1
+            print(f"[{datetime.now()}] [드라이버] Chrome 기동 실패: {e}")
+            with self._cond:
+                self._live -= 1
+                self._cond.notify_all()
+            return
+
+        with self._cond:
+            if self._closed:
+                self._live -= 1
+                self._quit(driver)
+            else:
+                self._idle.append(driver)
+            self._cond.notify_all()
+
+    def warm_up(self):
+        """부족한 드라이버를 백그라운드에서 미리 기동"""
+        with self._cond:
+            missing = self.size - self._live
+            self._live += max(0, missing)
+
+        for _ in range(max(0, missing)):
+            threading.Thread(target=self._warm_one, daemon=True).start()
+
+    def is_alive(self, driver):
+        """드라이버 응답 여부 확인 (멈춘 경우도 죽은 것으로 판단)"""
+        done, _, error = run_with_timeout(
+            lambda: driver.execute_script("return 1"), self.health_timeout
+        )
+        return done and error is None
+
+    def _quit(self, driver):
+        """드라이버 종료, 응답이 없으면 프로세스 강제 종료"""
+        done, _, _ = run_with_timeout(driver.quit, self.health_timeout)
+        if not done:
+            try:
+                driver.service.process.kill()
+            except Exception:
+                pass
+
+    def _discard(self, driver):
+        self._quit(driver)
+        with self._cond:
+            self._live -= 1
+            self._cond.notify_all()
+
+    def acquire(self, timeout=90):
+        """살아있는 드라이버를 하나 빌려옴"""
+        deadline = time.time() + timeout
+
+        while True:
+            launch = False
+            with self._cond:
+                if self._closed:
+                    raise RuntimeError("드라이버 풀이 닫혔습니다.")
+                while not self._idle:
+                    if self._live < self.size:
+                        self._live += 1
+                        launch = True
+                        break
+                    remaining = deadline - time.time()
+                    if remaining <= 0 or not self._cond.wait(remaining):
+                        raise TimeoutError("사용 가능한 드라이버가 없습니다.")
+                driver = None if launch else self._idle.pop()
+
+            if launch:
+                try:
+                    return self._launch()
+                except Exception:
+                    self.stats["failed"] += 1
+                    with self._cond:
+                        self._live -= 1
+                        self._cond.notify_all()
+                    raise
+
+            if self.is_alive(driver):
+                return driver
+
+            print(f"[{datetime.now()}] [드라이버] 응답 없는 드라이버 교체")
+            self.stats["replaced"] += 1
+            self._discard(driver)
+
+    def release(self, driver, broken=False):
+        """드라이버 반납 (broken이면 폐기 후 백그라운드에서 새로 기동)"""
+        if broken or self._closed:
+            self._discard(driver)
+            if not self._closed:
+                self.warm_up()
+            return
+
+        with self._cond:
+            self._idle.append(driver)
+            self._cond.notify_all()
+
+    @contextmanager
+    def driver(self, timeout=90):
+        """with pool.driver() as driver: 형태로 사용"""
+        driver = self.acquire(timeout)
+        broken = False
+        try:
+            yield driver
+        except Exception:
+            broken = True
+            raise
+        finally:
+            self.release(driver, broken)
+
+    def close(self):
+        """풀에 있는 모든 드라이버 종료"""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        for driver in idle:
+            self._discard(driver)
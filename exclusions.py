@@ -0,0 +1,116 @@
+"""
+재입고 알림 제외 목록
+외부 JSON 파일의 상품 ID는 set으로, 키워드는 Aho-Corasick 오토마톤 하나로 미리 컴파일해
+키워드가 수백 개로 늘어도 제목 길이에 비례하는 시간에 검사합니다.
+파일이 바뀌면 maybe_reload()에서 다시 읽습니다 (데몬 모드 사이클마다 호출).
+
+파일 형식 (값은 메모):
+    {
+        "ids": {"153151430": "Yes24 - 브라운 아이드 소울 Soul Tricycle 2LP"},
+        "keywords": {"Soul Tricycle": ""}
+    }
+"""
+
+import json
+import os
+from collections import deque
+
+
+class AhoCorasick:
+    """대소문자 구분 없는 다중 패턴 매처"""
+
+    def __init__(self, patterns):
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [None]
+
+        for pattern in patterns:
+            key = pattern.casefold()
+            if not key:
+                continue
+            state = 0
+            for char in key:
+                if char not in self.goto[state]:
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append(None)
+                    self.goto[state][char] = len(self.goto) - 1
+                state = self.goto[state][char]
+            if self.output[state] is None:
+                self.output[state] = pattern
+
+        # 실패 링크 (BFS) - 더 짧은 접미사에서 끝나는 패턴도 output으로 물려받음
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in self.goto[state].items():
+                queue.append(child)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.goto[fallback].get(char, 0)
+                if self.output[child] is None:
+                    self.output[child] = self.output[self.fail[child]]
+
+    def search(self, text):
+        """text에 처음 나타나는 패턴 (없으면 None)"""
+        state = 0
+        goto, fail, output = self.goto, self.fail, self.output
+        for char in text.casefold():
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state] is not None:
+                return output[state]
+        return None
+
+
+class ExclusionList:
+    """제외 상품 ID + 키워드 매처 (파일이 바뀌면 다시 불러옴)"""
+
+    def __init__(self, path):
+        self.path = path
+        self.ids = set()
+        self.keywords = []
+        self.matcher = AhoCorasick([])
+        self._signature = None
+        self.maybe_reload()
+
+    def _stat(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def maybe_reload(self):
+        """파일이 바뀌었으면 다시 읽고 True 반환 (읽기 실패 시 기존 목록 유지)"""
+        signature = self._stat()
+        if signature == self._signature:
+            return False
+        self._signature = signature
+        if signature is None:
+            print(f"재입고 제외 목록 파일이 없습니다: {self.path}")
+            return False
+
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"재입고 제외 목록을 읽지 못해 기존 목록을 유지합니다: {e}")
+            return False
+
+        self.ids = {str(pid) for pid in data.get("ids", {})}
+        self.keywords = list(data.get("keywords", {}))
+        self.matcher = AhoCorasick(self.keywords)
+        print(f"재입고 제외 목록 불러옴: ID {len(self.ids)}개, 키워드 {len(self.keywords)}개")
+        return True
+
+    def match(self, product_id, title):
+        """제외 사유 ("id" 또는 "keyword:...") - 제외 대상이 아니면 None"""
+        if str(product_id) in self.ids:
+            return "id"
+        keyword = self.matcher.search(title or "")
+        if keyword is not None:
+            return f"keyword:{keyword}"
+        return None
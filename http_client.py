@@ -0,0 +1,134 @@
+"""
+공용 HTTP 클라이언트
+호스트마다 keep-alive 세션 하나를 두고 스크래핑과 Discord 요청이 함께 재사용합니다.
+gzip/deflate(+ brotli 설치 시 br) 압축, 공통 타임아웃, 호스트별 연결 재사용 카운터를 제공하며
+LP_HTTP2=1이고 httpx[http2]가 설치되어 있으면 HTTP/2로 요청합니다.
+"""
+
+import threading
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# (연결, 읽기) 타임아웃 초
+DEFAULT_TIMEOUT = (5, 10)
+
+
+def supported_encodings():
+    """응답 압축 해제가 가능한 인코딩 목록"""
+    encodings = ["gzip", "deflate"]
+    for module in ("brotli", "brotlicffi"):
+        try:
+            __import__(module)
+            encodings.append("br")
+            break
+        except ImportError:
+            continue
+    return ", ".join(encodings)
+
+
+def http2_available():
+    try:
+        import h2  # noqa: F401
+        import httpx  # noqa: F401
+
+        return True
+    except ImportError:
+        return False
+
+
+class HttpClient:
+    """호스트별 세션 풀"""
+
+    def __init__(self, headers=None, timeout=DEFAULT_TIMEOUT, pool_size=8, http2=False):
+        self.headers = dict(headers or {})
+        self.headers["Accept-Encoding"] = supported_encodings()
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self.http2 = http2 and http2_available()
+        self._sessions = {}
+        self._requests = {}
+        self._lock = threading.Lock()
+
+    def _new_session(self):
+        if self.http2:
+            import httpx
+
+            connect, read = self.timeout
+            # httpx는 기본적으로 리디렉션을 따라가지 않으므로 requests와 같게 맞춤
+            return httpx.Client(
+                http2=True,
+                follow_redirects=True,
+                headers=self.headers,
+                timeout=httpx.Timeout(read, connect=connect),
+                limits=httpx.Limits(max_connections=self.pool_size, max_keepalive_connections=self.pool_size),
+            )
+
+        session = requests.Session()
+        session.headers.update(self.headers)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    def session(self, url):
+        """URL 호스트의 세션 (없으면 생성)"""
+        host = urlsplit(url).netloc
+        with self._lock:
+            if host not in self._sessions:
+                self._sessions[host] = self._new_session()
+                self._requests[host] = 0
+            self._requests[host] += 1
+            return self._sessions[host]
+
+    def request(self, method, url, **kwargs):
+        # httpx 클라이언트는 생성 시 타임아웃을 지정함
+        if not self.http2:
+            kwargs.setdefault("timeout", self.timeout)
+        return self.session(url).request(method, url, **kwargs)
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def stats(self):
+        """호스트별 요청 수 / 새 연결 수 / 재사용 횟수
+
+        연결 수는 urllib3 커넥션 풀이 만든 연결 객체 수입니다 (HTTP/2 모드에서는 집계하지 않음).
+        """
+        result = {}
+        with self._lock:
+            items = list(self._sessions.items())
+        for host, session in items:
+            requests_made = self._requests.get(host, 0)
+            connections = None
+            if isinstance(session, requests.Session):
+                adapter = session.get_adapter(f"https://{host}")
+                pools = adapter.poolmanager.pools
+                connections = sum(
+                    pools[key].num_connections for key in pools.keys() if key.key_host == host.split(":")[0]
+                )
+            result[host] = {
+                "requests": requests_made,
+                "connections": connections,
+                "reused": requests_made - connections if connections is not None else None,
+            }
+        return result
+
+    def summary(self):
+        parts = []
+        for host, s in self.stats().items():
+            if s["connections"] is None:
+                parts.append(f"{host} 요청 {s['requests']}")
+            else:
+                parts.append(f"{host} 요청 {s['requests']}/연결 {s['connections']}/재사용 {s['reused']}")
+        return ", ".join(parts)
+
+    def close(self):
+        with self._lock:
+            sessions, self._sessions = list(self._sessions.values()), {}
+        for session in sessions:
+            session.close()
@@ -0,0 +1,266 @@
+"""
+사이트 간 같은 음반 묶기
+상품명을 "아티스트 - 앨범"으로 나눠 컬러/에디션 괄호, 포맷 표기("2LP", "180g"), "정규 5집" 같은 수식어를 빼고
+토큰으로 정규화합니다. 아티스트의 괄호 속 로마자/한글 표기는 별칭으로 따로 보관해 어느 쪽으로 적어도 맞춥니다.
+컬러/디스크 수/포맷/세트 표기는 따로 판(Variant)으로 정규화해 같은 앨범이라도 다른 판은 묶지 않습니다.
+토큰 역색인에서 가장 드문 토큰 몇 개의 목록만 후보로 보므로 상품 수가 늘어도 비교 횟수는 거의 늘지 않습니다.
+같은 음반으로 묶인 상품은 대표 ID(release_id)를 공유하고, 상품별 대표 ID는 JSON 파일로 저장해 실행 간에 유지합니다.
+"""
+
+import hashlib
+import json
+import os
+import re
+import unicodedata
+from collections import namedtuple
+
+# 괄호 속 내용이 이런 표기면 컬러/에디션/구성 정보로 보고 제거 (앨범명 괄호는 유지)
+_EDITION = re.compile(
+    r"lp|vinyl|컬러|color|colour|ver\b|버전|edition|에디션|한정|limited|180g|set|세트|랜덤|종|마블|marble|"
+    r"투명|clear|opaque|solid|솔리드|cd|tape|카세트|반$"
+)
+_BRACKET = re.compile(r"[\[(（【]([^\[\]()（）【】]*)[\])）】]?")
+_FORMAT = re.compile(r"\b\d*\s*(?:lp|cd)\b|\b180g\b|\bvinyl\b")
+_SEPARATOR = re.compile(r"\s+[-–—]\s+|\s*[–—]\s*")
+# 한글/로마자/숫자가 바뀌는 곳에서도 나눔 ("5집" → "5", "집")
+_TOKEN = re.compile(r"[가-힣]+|[a-z]+|\d+|[^\W\d_a-z가-힣]+")
+
+# 판 구분 표기 - 사이트마다 한글/영문 표기가 달라 같은 이름으로 맞춤 (긴 표기부터 비교)
+_COLOR_NAMES = {
+    "씨블루": "seablue", "sea blue": "seablue", "투명": "clear", "클리어": "clear", "transparent": "clear",
+    "clear": "clear", "레드": "red", "red": "red", "블루": "blue", "blue": "blue", "화이트": "white",
+    "white": "white", "블랙": "black", "black": "black", "골드": "gold", "gold": "gold", "실버": "silver",
+    "silver": "silver", "마블": "marble", "marble": "marble", "퍼플": "purple", "purple": "purple",
+    "버건디": "burgundy", "burgundy": "burgundy", "오렌지": "orange", "orange": "orange", "옐로우": "yellow",
+    "옐로": "yellow", "yellow": "yellow", "그린": "green", "green": "green", "핑크": "pink", "pink": "pink",
+    "상그리아": "sangria", "sangria": "sangria", "옥색": "jade",
+}
+_COLOR = re.compile(
+    "|".join(
+        rf"\b{re.escape(name)}\b" if name.isascii() else re.escape(name)
+        for name in sorted(_COLOR_NAMES, key=len, reverse=True)
+    )
+)
+_COLORED = re.compile(r"컬러|colou?r")
+_DISCS = re.compile(r"(\d+)\s*(lp|cd)\b")
+_FORMATS = {"lp": re.compile(r"lp\b|vinyl|바이닐"), "cd": re.compile(r"cd\b"), "tape": re.compile(r"\btape\b|카세트")}
+_SET = re.compile(r"\bset\b|세트")
+_EDITIONS = {"deluxe": re.compile(r"deluxe|디럭스"), "standard": re.compile(r"standard|스탠다드")}
+
+STOPWORDS = frozenset({
+    "lp", "정규", "앨범", "정규앨범", "미니", "미니앨범", "싱글", "ep", "집", "the", "album", "mini", "studio",
+    "single", "st", "nd", "rd", "th", "set",
+})
+
+Title = namedtuple("Title", ["artist", "aliases", "album", "variant"])
+# colors: 컬러 이름, colored: 컬러반 여부 ("컬러 LP"처럼 이름 없이 적은 경우 포함), discs: 장수 (없으면 None)
+Variant = namedtuple("Variant", ["colors", "colored", "formats", "discs", "is_set", "editions"])
+
+
+def _tokens(text):
+    return frozenset(token for token in _TOKEN.findall(text) if token not in STOPWORDS)
+
+
+def _strip_editions(text):
+    """컬러/에디션 괄호 제거, 나머지 괄호는 내용만 남김"""
+    def keep(match):
+        inner = match.group(1)
+        return " " if _EDITION.search(inner) else f" {inner} "
+    return _BRACKET.sub(keep, text)
+
+
+def normalize_variant(text):
+    """상품명 → 판 정보 (컬러, 포맷, 장수, 세트 여부, 디럭스/스탠다드)"""
+    colors = frozenset(_COLOR_NAMES[name] for name in _COLOR.findall(text))
+    discs = {int(count) for count, _ in _DISCS.findall(text)}
+    formats = frozenset(name for name, pattern in _FORMATS.items() if pattern.search(text)) or frozenset({"lp"})
+    return Variant(
+        colors,
+        bool(colors) or bool(_COLORED.search(text)),
+        formats,
+        max(discs) if discs else None,
+        bool(_SET.search(text)),
+        frozenset(name for name, pattern in _EDITIONS.items() if pattern.search(text)),
+    )
+
+
+def same_variant(a, b):
+    """같은 판인지 (장수/컬러 이름/에디션은 한쪽에만 적혀 있으면 같은 것으로 봄)"""
+    if a.formats != b.formats or a.is_set != b.is_set or a.colored != b.colored:
+        return False
+    if a.discs is not None and b.discs is not None and a.discs != b.discs:
+        return False
+    if a.colors and b.colors and a.colors != b.colors:
+        return False
+    return not (a.editions and b.editions and a.editions != b.editions)
+
+
+def normalize_title(title):
+    """상품명 → Title(아티스트 토큰, 아티스트 별칭 토큰, 앨범 토큰, 판 정보)"""
+    text = unicodedata.normalize("NFKC", title or "").casefold()
+    parts = _SEPARATOR.split(text, maxsplit=1)
+    if len(parts) == 2:
+        artist_text, album_text = parts
+    else:
+        artist_text, album_text = "", text
+
+    # 아티스트 괄호는 별칭 ("혁오 (HYUKOH)"), 앞에 붙은 "[SET]" 같은 표기는 버림
+    aliases = set()
+    for inner in _BRACKET.findall(artist_text):
+        if not _EDITION.search(inner):
+            aliases |= _tokens(inner)
+    artist = _tokens(_BRACKET.sub(" ", artist_text))
+
+    album = _tokens(_FORMAT.sub(" ", _strip_editions(album_text)))
+    return Title(artist, frozenset(aliases) - artist, album, normalize_variant(text))
+
+
+def release_key(title):
+    """정규화된 상품명 → 대표 ID (판 정보 포함)"""
+    variant = title.variant
+    key = "|".join([
+        " ".join(sorted(title.artist)),
+        " ".join(sorted(title.album)),
+        " ".join(sorted(variant.colors)) or ("color" if variant.colored else ""),
+        " ".join(sorted(variant.formats)),
+        str(variant.discs or ""),
+        "set" if variant.is_set else "",
+        " ".join(sorted(variant.editions)),
+    ])
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:12]
+
+
+class ReleaseIndex:
+    """상품명 토큰 역색인 + 음반별 상품 묶음"""
+
+    def __init__(self, path=None, min_overlap=0.8, max_candidates=3):
+        self.path = path
+        self.min_overlap = min_overlap
+        # 후보를 뽑을 때 쓰는 가장 드문 토큰 수
+        self.max_candidates = max_candidates
+        self.postings = {}
+        self.releases = {}
+        self.members = {}
+        self.assigned = {}
+        self._claimed = {}
+        # 먼저 알린 사이트 알림에 함께 넣을 다른 사이트 상품 {(음반, 이벤트): {(사이트, 상품 ID): None}}
+        self._joined = {}
+        # 이전 실행에서 정한 상품별 대표 ID {"사이트:상품 ID": 대표 ID}
+        self.known = {}
+        if path and os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    self.known = json.load(f)
+            except (OSError, ValueError):
+                self.known = {}
+
+    def _artist_matches(self, a, b):
+        if not (a.artist or a.aliases) or not (b.artist or b.aliases):
+            return None
+        return bool((a.artist | a.aliases) & (b.artist | b.aliases))
+
+    def _score(self, a, b):
+        """두 상품명이 같은 음반인지 점수 (0~1, 다른 판이면 0)"""
+        if not a.album or not b.album or not same_variant(a.variant, b.variant):
+            return 0.0
+        common = len(a.album & b.album)
+        artist = self._artist_matches(a, b)
+        if artist is False:
+            return 0.0
+        if artist is None:
+            # 아티스트를 알 수 없으면 앨범 토큰 전체가 비슷해야 함
+            return common / len(a.album | b.album)
+        # 아티스트가 같으면 한쪽 앨범명이 다른 쪽에 포함돼도 같은 음반 ("VOL.1" ⊂ "Album VOL.1 Kim Hyun Chul")
+        shorter = min(len(a.album), len(b.album))
+        if shorter == 1 and a.album != b.album:
+            return 0.0
+        return common / shorter
+
+    def find(self, title):
+        """가장 비슷한 음반의 대표 ID (기준 미달이면 None)"""
+        tokens = title.album | title.artist | title.aliases
+        rare = sorted((token for token in tokens if token in self.postings), key=lambda t: len(self.postings[t]))
+        candidates = set()
+        for token in rare[:self.max_candidates]:
+            candidates |= self.postings[token]
+
+        best, best_score = None, self.min_overlap
+        for release_id in candidates:
+            score = self._score(title, self.releases[release_id])
+            if score >= best_score:
+                best, best_score = release_id, score
+        return best
+
+    def add(self, site, product_id, product):
+        """상품을 색인에 넣고 대표 ID 반환 (비슷한 음반이 없으면 새 음반)"""
+        title = normalize_title(product.title)
+        known = self.known.get(f"{site}:{product_id}")
+        release_id = None
+        if known in self.releases and self._score(title, self.releases[known]) >= self.min_overlap:
+            release_id = known
+        if release_id is None:
+            release_id = self.find(title)
+        if release_id is None:
+            # 이전에 정한 대표 ID가 있으면 그대로 사용 (실행마다 같은 음반이 같은 ID를 갖도록)
+            release_id = known if known and known not in self.releases else release_key(title)
+            if release_id in self.releases:
+                # 같은 키지만 기준 미달(앨범 토큰 없음 등)인 경우 별도 음반으로
+                release_id = f"{release_id}-{site}-{product_id}"
+            self.releases[release_id] = title
+            self.members[release_id] = {}
+            for token in title.album | title.artist | title.aliases:
+                self.postings.setdefault(token, set()).add(release_id)
+        self.members[release_id][(site, product_id)] = product
+        self.assigned[(site, product_id)] = release_id
+        return release_id
+
+    def add_all(self, products):
+        """{사이트: {상품 ID: 상품}} 전체 색인"""
+        for site, site_products in products.items():
+            for product_id, product in site_products.items():
+                self.add(site, product_id, product)
+
+    def release_of(self, site, product_id):
+        return self.assigned.get((site, product_id))
+
+    def offers(self, site, product_id):
+        """같은 음반으로 묶인 상품 [(사이트, 상품 ID, 상품), ...] (자신 포함)"""
+        release_id = self.assigned.get((site, product_id))
+        if release_id is None:
+            return []
+        return [(s, pid, product) for (s, pid), product in self.members[release_id].items()]
+
+    def claim(self, site, product_id, event):
+        """이번 사이클에 다른 사이트가 이 음반의 event 알림을 먼저 맡았으면 False (같은 사이트의 다른 상품은 허용)
+
+        False인 상품은 먼저 맡은 사이트 알림에 함께 넣도록 기록합니다 (joined).
+        """
+        release_id = self.assigned.get((site, product_id))
+        if release_id is None:
+            return True
+        if self._claimed.setdefault((release_id, event), site) == site:
+            return True
+        self._joined.setdefault((release_id, event), {})[(site, product_id)] = None
+        return False
+
+    def joined(self, site, product_id, event):
+        """이 상품 알림에 함께 넣을 다른 사이트 상품 [(사이트, 상품 ID, 상품), ...]"""
+        release_id = self.assigned.get((site, product_id))
+        if release_id is None:
+            return []
+        members = self.members[release_id]
+        return [(s, pid, members[(s, pid)]) for s, pid in self._joined.get((release_id, event), {})]
+
+    def save(self):
+        """상품별 대표 ID 저장 (이번에 나오지 않은 상품의 ID도 유지, 임시 파일에 쓴 뒤 교체)"""
+        if not self.path:
+            return
+        self.known.update({f"{site}:{pid}": release_id for (site, pid), release_id in self.assigned.items()})
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.known, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def summary(self):
+        shared = sum(1 for members in self.members.values() if len({site for site, _ in members}) > 1)
+        return f"음반 {len(self.releases)}개 (여러 사이트 {shared}개)"
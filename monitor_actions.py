@@ -5,16 +5,42 @@ LP 통합 모니터링 스크립트 (GitHub Actions용)
 Yes24 + Aladin + Ktown4u
 """
 
-import requests
-from bs4 import BeautifulSoup
+import argparse
 import json
 import os
 import re
 import random
-from datetime import datetime, timezone
+import signal
+import threading
+from datetime import date, datetime, timezone
 import time
 from concurrent.futures import ThreadPoolExecutor
 
+from browser_wait import (
+    click_and_wait_for_rerender,
+    collect_click_watch,
+    scroll_and_wait_for_items,
+    start_click_watch,
+    wait_for_dom_quiet,
+)
+from changes import EventType, diff_site, group_events, summarize
+from driver_pool import DriverPool
+from exclusions import ExclusionList
+from http_client import HttpClient
+from matching import ReleaseIndex
+from notifier import DiscordNotifier, NotificationDispatcher
+from outbox import Outbox
+from page_cache import PageCache
+from price_history import DropRule, PriceHistory
+from parsers import ParseScope, SoldoutClassifier, compare_backends, parse_html, resolve_backend
+from products import Product, Site, format_price, parse_price, to_dicts, to_products
+from rate_limit import AdaptiveRateLimiter
+from retention import Retention
+from scheduler import ViewScheduler
+import snapshot
+from sites import SiteAdapter, SiteScheduler
+from store import ProductStore
+
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
@@ -28,70 +54,217 @@ SITES = {
         "name": "Yes24",
         "url": "https://www.yes24.com/Product/Category/Display/003001033001",
         "color": 0x00D4AA,
+        # 파싱할 상품 목록 영역
+        "scope": ParseScope("li", {"data-goods-no": True}, r"<li\b[^>]*\bdata-goods-no="),
+        # 품절 판별 규칙 (앞에 있을수록 우선)
+        "soldout": SoldoutClassifier([
+            ("text", "품절"),
+            ("markup", "soldout"),
+            ("class", "soldout"),
+        ]),
     },
     "aladin": {
         "name": "알라딘",
         "url": "https://www.aladin.co.kr/shop/wbrowse.aspx?BrowseTarget=List&ViewRowsCount=25&ViewType=Detail&PublishMonth=0&SortOrder=6&page=1&Stockstatus=1&PublishDay=84&CID=86800&SearchOption=",
         "color": 0xFFD700,
+        "scope": ParseScope("div", {"class": "ss_book_box"}, r"<div\b[^>]*\bclass=\"ss_book_box\""),
+        "soldout": SoldoutClassifier([
+            ("text", "품절"),
+            ("text", "절판"),
+            ("text", "일시품절"),
+            ("text", "구매불가"),
+            ("text", "재입고 알림"),  # 재입고 알림 버튼이 있으면 품절
+            ("text", "유통이 중단"),  # 유통 중단 메시지
+            ("markup", "soldout"),
+            ("markup", "sold_out"),
+            ("markup", "sold-out"),
+            ("class", "soldout"),
+            ("class", "품절"),
+            ("img_alt", "품절"),
+            ("img_src", "soldout"),
+        ]),
     },
     "ktown4u": {
         "name": "Ktown4u",
         "url": "https://kr.ktown4u.com/searchList?goodsTextSearch=lp&goodsSearch=newgoods",
         "color": 0xFF6B6B,
+        "scope": ParseScope("a", {"href": re.compile(r"/iteminfo\?")}, r"<a\b[^>]*\bhref=\"[^\"]*/iteminfo\?", tail=5000),
+        "soldout": SoldoutClassifier([("text", "품절")]),
     },
 }
 
 # Discord Webhooks (신상품/재입고 분리)
 DISCORD_WEBHOOK_NEW = os.environ.get("DISCORD_WEBHOOK_NEW", "")
 DISCORD_WEBHOOK_RESTOCK = os.environ.get("DISCORD_WEBHOOK_RESTOCK", "")
+# 가격 인하 알림 (설정하지 않으면 이력만 기록)
+DISCORD_WEBHOOK_PRICE = os.environ.get("DISCORD_WEBHOOK_PRICE", "")
+# 알림 종류별 웹훅/표시 이름
+EVENT_WEBHOOKS = {"new": DISCORD_WEBHOOK_NEW, "restock": DISCORD_WEBHOOK_RESTOCK, "price": DISCORD_WEBHOOK_PRICE}
+EVENT_NAMES = {"new": "신상품", "restock": "재입고", "price": "가격 인하"}
+
 DATA_FILE = "products.json"
 
-# 재입고 알림 제외 상품 (상품 ID 또는 제목 키워드)
-RESTOCK_EXCLUDE = {
-    "ids": {
-        "153151430",  # Yes24 - 브라운 아이드 소울 Soul Tricycle 블루 컬러 2LP
-        "167465825",  # Yes24 - 브라운 아이드 소울 Soul Tricycle 2LP
-        "378968965",  # Aladin - 브라운 아이드 소울 Soul Tricycle 2LP
-        "152687",     # Ktown4u - 브라운 아이드 소울 Soul Tricycle 2LP
-        "154936022",  # Yes24 - Mark Tuan Silhouette LP
-        "373080976",  # Aladin - Mark Tuan Silhouette LP
-        "148039",     # Ktown4u - Mark Tuan Silhouette LP
-        "386044574",  # Aladin - 터치드 TOUCHED GSI Edition LP
-        "386043641",  # Aladin - 김수영 Antiguo Trunk LP
-        "384368363",  # Aladin - 김현철 VOL.1 LP
-        "384368953",  # Aladin - 김현철 VOL.1 골드 마블 컬러 LP
-        "386060891",  # Aladin - 권나무 삶의 향기 2LP
-    },
-    "keywords": [
-        "브라운 아이드 소울",
-        "Brown Eyed Soul",
-        "Soul Tricycle",
-        "Mark Tuan",
-        "Silhouette",
-        "GSI Edition",  # GSI 에디션 LP (품절 감지 문제)
-        "UXLXVE",       # 엑스러브 미니 1집
-        "Flower of the Day",  # 우예린 Flower of the Day & Night LP
-        "눈에 보이지 않는 노래는",  # 연정 눈에 보이지 않는 노래는 LP
-    ]
+# 상품 목록 스냅샷 형식 (json / json.gz / msgpack / msgpack.zst) - 기존 products.json은 형식과 관계없이 읽음
+SNAPSHOT_FORMAT = os.environ.get("LP_SNAPSHOT", "json")
+SNAPSHOT_FILE = snapshot.path_for(DATA_FILE, SNAPSHOT_FORMAT)
+
+# 상품 저장소: LP_STORE=sqlite면 SQLite (변경분만 저장), 기본은 DATA_FILE JSON
+STORE_FILE = "products.db"
+STORE = ProductStore(STORE_FILE, decode=Product.from_dict) if os.environ.get("LP_STORE", "json") == "sqlite" else None
+
+# 보존 기간 (일) - 이 기간 동안 목록에 나오지 않은 상품은 아카이브 저장소로 이동
+RETENTION_DAYS = int(os.environ.get("RETENTION_DAYS", "180"))
+ARCHIVE_FILE = "products_archive.db"
+RETENTION = Retention(ProductStore(ARCHIVE_FILE, decode=Product.from_dict), RETENTION_DAYS)
+
+# 데몬 모드 기본 실행 주기 (초)
+DAEMON_INTERVAL = 90
+DAEMON_JITTER = 15
+
+# 미리 띄워 둘 Chrome 인스턴스 수
+DRIVER_POOL_SIZE = int(os.environ.get("DRIVER_POOL_SIZE", "1"))
+
+# 스크래핑/Discord 공용 HTTP 클라이언트 (호스트별 keep-alive 세션, 사이클 간 재사용)
+HTTP_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Accept-Language': 'ko-KR,ko;q=0.9',
+}
+HTTP_CLIENT = HttpClient(headers=HTTP_HEADERS, http2=os.environ.get("LP_HTTP2") == "1")
+
+# Discord 알림 (메시지당 임베드 10개씩, 웹훅 속도 제한 준수) - 백그라운드 스레드에서 전송
+NOTIFIER = DiscordNotifier(HTTP_CLIENT)
+DISPATCHER = NotificationDispatcher(NOTIFIER, maxsize=int(os.environ.get("NOTIFY_QUEUE_SIZE", "100")))
+# 종료 전에 남은 알림을 보내기 위해 기다리는 최대 시간(초)
+NOTIFY_DRAIN_TIMEOUT = float(os.environ.get("NOTIFY_DRAIN_TIMEOUT", "60"))
+
+# 목록 페이지 지문 캐시 (바뀌지 않은 페이지는 파싱/비교 생략)
+PAGE_CACHE_FILE = "page_cache.json"
+PAGE_CACHE = PageCache(PAGE_CACHE_FILE)
+
+# 알림 아웃박스 (재시도된 실행에서 중복 전송 방지, 못 보낸 알림은 다음 실행에서 재전송)
+OUTBOX_FILE = "outbox.db"
+OUTBOX = Outbox(OUTBOX_FILE, max_attempts=int(os.environ.get("OUTBOX_MAX_ATTEMPTS", "5")))
+
+# 뷰(정렬/페이지)별 적응형 폴링 - 이벤트가 자주 나오는 뷰를 더 자주 조회 (전체 요청량은 모든 뷰를 VIEW_BASE_INTERVAL마다 조회하는 양)
+# 간격은 데몬 주기 기준이므로 ADAPTIVE_POLLING을 지정하지 않으면 데몬 모드에서만 켜짐 (main 참고)
+VIEW_SCHEDULE_FILE = "view_schedule.json"
+VIEW_SCHEDULER = ViewScheduler(
+    VIEW_SCHEDULE_FILE,
+    base_interval=float(os.environ.get("VIEW_BASE_INTERVAL", DAEMON_INTERVAL)),
+    min_interval=float(os.environ.get("VIEW_MIN_INTERVAL", "45")),
+    max_interval=float(os.environ.get("VIEW_MAX_INTERVAL", "900")),
+    enabled=os.environ.get("ADAPTIVE_POLLING", "1") == "1",
+)
+
+# 가격 이력 (가격이 바뀔 때만 기록) + 가격 인하 알림 기준
+PRICE_HISTORY_FILE = "price_history.db"
+PRICE_HISTORY = PriceHistory(PRICE_HISTORY_FILE)
+PRICE_DROP_RULE = DropRule(
+    min_percent=float(os.environ.get("PRICE_DROP_MIN_PERCENT", "5")),
+    min_amount=int(os.environ.get("PRICE_DROP_MIN_AMOUNT", "1000")),
+    lowest_only=os.environ.get("PRICE_DROP_LOWEST_ONLY") == "1",
+)
+
+# 호스트별 요청 속도 제한 (초당 요청 수, 버스트) - 429를 받으면 자동으로 감속
+RATE_LIMITER = AdaptiveRateLimiter({
+    "www.aladin.co.kr": (
+        float(os.environ.get("ALADIN_RATE", "1.0")),
+        int(os.environ.get("ALADIN_BURST", "4")),
+    ),
+})
+
+# 알라딘 조회 페이지 (표시 이름, URL) - 앞에 있는 페이지의 상품 정보가 우선
+ALADIN_LIST_URL = "https://www.aladin.co.kr/shop/wbrowse.aspx?BrowseTarget=List&ViewRowsCount=25&ViewType=Detail&PublishMonth=0&page=1&PublishDay=84&CID=86800&SearchOption="
+# 리뷰순은 날짜 필터 없이 2페이지까지 (재입고 체크용)
+ALADIN_REVIEW_URL = "https://www.aladin.co.kr/shop/wbrowse.aspx?BrowseTarget=List&ViewRowsCount=25&ViewType=Detail&CID=86800&SortOrder=4"
+ALADIN_VIEWS = [
+    ("출시일순", ALADIN_LIST_URL + "&SortOrder=5"),
+    ("등록일순", ALADIN_LIST_URL + "&SortOrder=6"),
+    ("리뷰순 1페이지", ALADIN_REVIEW_URL + "&page=1"),
+    ("리뷰순 2페이지", ALADIN_REVIEW_URL + "&page=2"),
+]
+
+# Yes24 정렬 (data-search-value, 표시 이름) - 앞에 있는 정렬의 상품 정보가 우선
+YES24_SORTS = [
+    ("RECENT", "신상품순"),
+    ("REG_DTS", "등록일순"),
+    ("SALE_SCO", "판매량순"),
+]
+# Yes24 HTTP 조회 시 목록 쿼리 (정렬별로 한 번에 가져올 상품 수)
+YES24_LIST_QUERY = "sortTp={sort}&pageNumber=1&pageSize={size}"
+YES24_PAGE_SIZE = 120
+# 브라우저 조회 시 정렬마다 탭을 따로 열어 동시에 진행
+YES24_PARALLEL_TABS = os.environ.get("YES24_PARALLEL_TABS", "1") == "1"
+
+# Ktown4u 검색 API (검색 페이지가 내부적으로 호출하는 엔드포인트) - 주소와 응답 형식을 확인하지 못해 기본은 꺼짐
+# KTOWN4U_SEARCH_API에 주소를 지정하면 먼저 API로 조회하고, 실패하면 브라우저로 대체
+KTOWN4U_SEARCH_API = os.environ.get("KTOWN4U_SEARCH_API", "")
+KTOWN4U_SEARCH_PARAMS = {"goodsTextSearch": "lp", "goodsSearch": "newgoods"}
+KTOWN4U_PAGE_SIZE = 60
+KTOWN4U_MAX_PAGES = 5
+# 응답에서 상품 목록 위치 (점으로 구분한 키 경로)와 상품 항목의 필드 이름
+KTOWN4U_GOODS_PATH = os.environ.get("KTOWN4U_GOODS_PATH", "data.list").split(".")
+KTOWN4U_FIELDS = {
+    "id": "goodsNo",
+    "title": "goodsNm",
+    "price": "salePrice",
+    "soldout": "soldOutYn",
+    "image": "imgUrl",
 }
 
+# 사이트별 조회 시간 예산(초) - 넘기면 그 사이트는 이번 사이클 결과에서 제외
+SITE_BUDGET = float(os.environ.get("SITE_BUDGET", "180"))
+# 예산을 넘겨 취소한 조회가 멈출 때까지 사이클 저장/종료 전에 기다릴 시간(초)
+SITE_DRAIN_TIMEOUT = float(os.environ.get("SITE_DRAIN_TIMEOUT", "30"))
+
+# 알림의 판매처 필드에 표시할 최대 상품 수
+MAX_OFFERS = 6
+
+# 상품별 음반 대표 ID (실행 간에 같은 음반이 같은 ID를 갖도록 저장)
+RELEASES_FILE = "releases.json"
+
+# 재입고 알림 제외 상품 (상품 ID 또는 제목 키워드) - 두 스크립트가 같은 파일을 사용
+RESTOCK_EXCLUDE_FILE = "restock_exclude.json"
+RESTOCK_EXCLUDE = ExclusionList(RESTOCK_EXCLUDE_FILE)
+
+
+def saved_snapshot_path():
+    """불러올 스냅샷 파일 (설정한 형식 → 기존 JSON 순, 없으면 None)"""
+    for path in (SNAPSHOT_FILE, DATA_FILE):
+        if os.path.exists(path):
+            return path
+    return None
+
 
 def load_saved_products():
     """저장된 상품 목록 불러오기"""
-    if os.path.exists(DATA_FILE):
-        with open(DATA_FILE, "r", encoding="utf-8") as f:
-            data = json.load(f)
-            for site_key in SITES.keys():
-                if site_key not in data:
-                    data[site_key] = {}
-            return data
+    if STORE is not None:
+        # 처음 SQLite 저장소를 쓸 때 기존 JSON을 한 번 가져옴
+        path = saved_snapshot_path()
+        if STORE.is_empty() and path:
+            imported = STORE.import_data(snapshot.load(path))
+            print(f"[{datetime.now()}] {path}에서 상품 {imported}개를 저장소로 가져왔습니다.")
+        return STORE.load(SITES.keys())
+
+    path = saved_snapshot_path()
+    if path:
+        data = to_products(snapshot.load(path))
+        for site_key in SITES.keys():
+            if site_key not in data:
+                data[site_key] = {}
+        return data
     return {site: {} for site in SITES.keys()}
 
 
 def save_products(products):
-    """상품 목록 저장"""
-    with open(DATA_FILE, "w", encoding="utf-8") as f:
-        json.dump(products, f, ensure_ascii=False, indent=2)
+    """상품 목록 저장 (SQLite 저장소면 바뀐 상품만 upsert)"""
+    if STORE is not None:
+        STORE.save(products)
+        return
+
+    # 임시 파일에 쓴 뒤 교체 (중간에 죽어도 캐시 파일이 깨지지 않음)
+    snapshot.save(SNAPSHOT_FILE, to_dicts(products), SNAPSHOT_FORMAT)
 
 
 def create_driver():
@@ -118,155 +291,280 @@ def create_driver():
     return driver
 
 
-def get_first_product_id(driver):
-    """현재 페이지의 첫 번째 상품 ID 가져오기"""
+def click_sort_and_wait(driver, sort_value, sort_name, max_wait=10):
+    """정렬 버튼 클릭 후 목록이 다시 그려질 때까지 대기 (측정한 대기 시간 반환)"""
     try:
-        first_item = driver.find_element(By.CSS_SELECTOR, "li[data-goods-no]")
-        return first_item.get_attribute("data-goods-no")
-    except:
+        result = click_and_wait_for_rerender(
+            driver,
+            f"a[data-search-value='{sort_value}']",
+            "li[data-goods-no]",
+            max_wait=max_wait * 1000,
+        )
+        waited = result["elapsed_ms"] / 1000
+
+        if result["status"] == "no_button":
+            print(f"[Yes24] {sort_name} 정렬 버튼 없음")
+            return None
+        if result["status"] == "changed":
+            print(f"[Yes24] {sort_name} 목록 갱신 감지 ({result['old_id']} → {result['new_id']}, {waited:.2f}초)")
+        else:
+            print(f"[Yes24] {sort_name} 목록 갱신 감지 실패 ({waited:.2f}초), 현재 목록으로 진행")
+        return waited
+
+    except Exception as e:
+        print(f"[Yes24] {sort_name} 정렬 실패: {e}")
         return None
 
 
-def click_sort_and_wait(driver, sort_value, sort_name, max_wait=10):
-    """정렬 버튼 클릭 후 페이지 변경 대기"""
-    try:
-        # 현재 첫 번째 상품 ID 저장
-        old_first_id = get_first_product_id(driver)
-        print(f"[Yes24] {sort_name} 정렬 클릭 (현재 첫 상품: {old_first_id})")
+def parse_yes24_products(html, backend=None, scoped=True):
+    """Yes24 목록 HTML에서 상품 파싱"""
+    root = parse_html(html, backend, SITES["yes24"]["scope"] if scoped else None)
+    page_products = {}
 
-        # JavaScript로 정렬 버튼 클릭
-        driver.execute_script(f"""
-            var btn = document.querySelector("a[data-search-value='{sort_value}']");
-            if (btn) btn.click();
-        """)
+    for item in root.select("li[data-goods-no]"):
+        try:
+            product_id = item.get("data-goods-no")
+            if not product_id:
+                continue
 
-        # 페이지 내용이 변경될 때까지 대기
-        start_time = time.time()
-        while time.time() - start_time < max_wait:
-            time.sleep(0.5)
-            new_first_id = get_first_product_id(driver)
-            if new_first_id and new_first_id != old_first_id:
-                print(f"[Yes24] {sort_name} 페이지 변경 감지 (새 첫 상품: {new_first_id})")
-                time.sleep(1)  # 추가 안정화 대기
-                return True
-
-        # 변경 안 되면 그냥 대기 후 진행
-        print(f"[Yes24] {sort_name} 페이지 변경 감지 실패, 5초 대기 후 진행")
-        time.sleep(5)
-        return True
+            title_tag = item.select_one("a.gd_name")
+            title = title_tag.text(strip=True) if title_tag else ""
+
+            price = None
+            price_input = item.select_one("input[name='ORD_GOODS_OPT']")
+            if price_input:
+                try:
+                    price_data = json.loads(price_input.get("value", "{}"))
+                    sale_price = price_data.get("salePrice", 0)
+                    if sale_price:
+                        price = int(sale_price)
+                except:
+                    pass
+
+            if price is None:
+                price_tag = item.select_one("em.yes_b")
+                if price_tag:
+                    price = parse_price(price_tag.text(strip=True))
+
+            img_tag = item.select_one("img")
+            img_url = ""
+            if img_tag:
+                img_url = img_tag.get("data-original") or img_tag.get("src", "")
+                if img_url.startswith("//"):
+                    img_url = "https:" + img_url
+
+            # 품절 여부 확인
+            is_soldout = SITES["yes24"]["soldout"].classify(item, product_id) is not None
+
+            if product_id and title:
+                page_products[product_id] = Product(
+                    Site.YES24,
+                    title[:100],
+                    f"https://www.yes24.com/Product/Goods/{product_id}",
+                    price,
+                    img_url,
+                    is_soldout,
+                )
+        except:
+            continue
 
-    except Exception as e:
-        print(f"[Yes24] {sort_name} 정렬 실패: {e}")
-        return False
+    return page_products
 
 
-def fetch_yes24_products(driver, saved_products, is_first_run):
-    """Yes24에서 상품 목록 가져오기 (신상품순 + 등록일순 + 판매량순)"""
-    products = {}
-    site_key = "yes24"
-    site_saved = saved_products.get(site_key, {})
+def fetch_yes24_views_http(site_saved, cancel):
+    """Yes24 정렬별 목록을 HTTP로 직접 조회
 
-    def parse_products_from_page():
-        soup = BeautifulSoup(driver.page_source, "html.parser")
-        page_products = {}
+    반환값: (정렬별 상품, 이전과 같은 정렬 이름 집합), 차단/빈 응답이거나 정렬이 적용되지 않았으면 None
+    """
+    views = {}
+    unchanged = set()
+    fetched = {}
+    base_url = SITES["yes24"]["url"]
 
-        for item in soup.select("li[data-goods-no]"):
-            try:
-                product_id = item.get("data-goods-no")
-                if not product_id:
-                    continue
+    for sort_value, sort_name in YES24_SORTS:
+        if cancel.is_set():
+            return None
+        if not VIEW_SCHEDULER.due(f"yes24:{sort_name}"):
+            continue
+        url = f"{base_url}?{YES24_LIST_QUERY.format(sort=sort_value, size=YES24_PAGE_SIZE)}"
+        cache_key = f"yes24:{sort_value}"
+        try:
+            response = HTTP_CLIENT.get(url, headers=PAGE_CACHE.request_headers(cache_key, site_saved))
+        except Exception as e:
+            print(f"[Yes24] {sort_name} HTTP 요청 실패: {e}")
+            return None
 
-                title_tag = item.select_one("a.gd_name")
-                title = title_tag.get_text(strip=True) if title_tag else ""
+        # 차단 페이지나 빈 목록이면 브라우저로 넘김
+        if response.status_code not in (200, 304) or (
+            response.status_code == 200 and "data-goods-no" not in response.text
+        ):
+            print(f"[Yes24] {sort_name} HTTP 응답 이상 (status={response.status_code})")
+            return None
 
-                price = ""
-                price_input = item.select_one("input[name='ORD_GOODS_OPT']")
-                if price_input:
-                    try:
-                        price_data = json.loads(price_input.get("value", "{}"))
-                        sale_price = price_data.get("salePrice", 0)
-                        if sale_price:
-                            price = f"{int(sale_price):,}원"
-                    except:
-                        pass
-
-                if not price:
-                    price_tag = item.select_one("em.yes_b")
-                    if price_tag:
-                        price = price_tag.get_text(strip=True) + "원"
-
-                img_tag = item.select_one("img")
-                img_url = ""
-                if img_tag:
-                    img_url = img_tag.get("data-original") or img_tag.get("src", "")
-                    if img_url.startswith("//"):
-                        img_url = "https:" + img_url
-
-                # 품절 여부 확인
-                item_text = item.get_text()
-                item_html = str(item).lower()
-                is_soldout = (
-                    "품절" in item_text
-                    or "soldout" in item_html
-                    or item.select_one('[class*="soldout"]') is not None
-                )
+        # 이전과 같은 페이지면 파싱/비교 생략
+        cached = PAGE_CACHE.lookup(cache_key, response, site_saved, SITES["yes24"]["scope"])
+        if cached is not None:
+            views[sort_name] = cached
+            unchanged.add(sort_name)
+            continue
 
-                if product_id and title:
-                    page_products[product_id] = {
-                        "title": title[:100],
-                        "price": price,
-                        "url": f"https://www.yes24.com/Product/Goods/{product_id}",
-                        "image": img_url,
-                        "soldout": is_soldout,
-                    }
-            except:
-                continue
+        page_products = parse_yes24_products(response.text)
+        if not page_products:
+            print(f"[Yes24] {sort_name} HTTP 응답에 상품 없음")
+            return None
 
-        return page_products
+        fetched[sort_name] = (cache_key, response)
+        views[sort_name] = page_products
 
-    def process_products(page_products, label):
-        """상품 처리 및 알림 전송"""
-        print(f"[Yes24] {label}: {len(page_products)}개")
+    # sortTp를 무시하고 기본 목록을 주면 모든 정렬의 상품 순서가 같음 → 캐시에 남기지 않고 브라우저로 넘김
+    # 이번에 건너뛴 정렬은 지난번에 저장한 순서와 비교
+    orders = [list(views[sort_name]) if sort_name in fetched else PAGE_CACHE.ids(f"yes24:{sort_value}")
+              for sort_value, sort_name in YES24_SORTS]
+    orders = [ids for ids in orders if ids]
+    if fetched and len(orders) > 1 and all(ids == orders[0] for ids in orders):
+        print("[Yes24] HTTP 응답에 정렬이 적용되지 않음 (정렬별 목록이 모두 같음)")
+        return None
 
-        if not is_first_run:
-            for pid, prod in page_products.items():
-                if pid not in site_saved and pid not in products:
-                    send_new_product_notification(site_key, {pid: prod})
-                elif pid in site_saved and site_saved[pid].get("soldout") and not prod.get("soldout"):
-                    send_restock_notification(site_key, {pid: prod})
+    if cancel.is_set():
+        return None
+    for sort_name, (cache_key, response) in fetched.items():
+        PAGE_CACHE.update(cache_key, response, views[sort_name])
+    return views, unchanged
 
-        for pid, prod in page_products.items():
-            if pid not in products:
-                products[pid] = prod
 
-    try:
-        url = SITES["yes24"]["url"]
-        print(f"[Yes24] 페이지 로드 중...")
-        driver.get(url)
+def fetch_yes24_views_selenium(driver, cancel):
+    """Yes24 정렬별 목록을 브라우저로 조회 (HTTP 실패 시 대체 경로)"""
+    views = {}
+    total_wait = 0.0
 
-        WebDriverWait(driver, 15).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, "li[data-goods-no]"))
-        )
-        time.sleep(2)
+    url = SITES["yes24"]["url"]
+    print(f"[Yes24] 페이지 로드 중...")
+    driver.get(url)
 
-        # 1. 신상품순 정렬
-        if click_sort_and_wait(driver, "RECENT", "신상품순"):
-            recent_products = parse_products_from_page()
-            process_products(recent_products, "신상품순")
+    WebDriverWait(driver, 15).until(
+        EC.presence_of_element_located((By.CSS_SELECTOR, "li[data-goods-no]"))
+    )
+    total_wait += wait_for_dom_quiet(driver)["elapsed_ms"] / 1000
 
-        # 2. 등록일순 정렬
-        if click_sort_and_wait(driver, "REG_DTS", "등록일순"):
-            # 스크롤해서 더 많은 상품 로드
+    for sort_value, sort_name in YES24_SORTS:
+        if cancel.is_set():
+            break
+        waited = click_sort_and_wait(driver, sort_value, sort_name)
+        if waited is None:
+            continue
+        total_wait += waited
+        if sort_value == "REG_DTS":
+            # 스크롤해서 더 많은 상품 로드 (더 이상 늘지 않으면 중단)
             for _ in range(3):
-                driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                time.sleep(1)
-            new_products = parse_products_from_page()
-            process_products(new_products, "등록일순")
+                result = scroll_and_wait_for_items(driver, "li[data-goods-no]")
+                total_wait += result["elapsed_ms"] / 1000
+                if result["status"] != "changed":
+                    break
+        views[sort_name] = parse_yes24_products(driver.page_source)
+
+    print(f"[Yes24] 브라우저 대기 시간 합계: {total_wait:.2f}초")
+    return views
+
+
+def fetch_yes24_views_tabs(driver, cancel, max_wait=10):
+    """정렬마다 탭을 하나씩 열어 동시에 로드/정렬 (대기 시간 ≈ 가장 느린 탭)"""
+    views = {}
+    url = SITES["yes24"]["url"]
+    main_handle = driver.current_window_handle
+    tabs = {}
+    start_time = time.time()
+
+    try:
+        # 1. 정렬별 탭을 모두 열어 둠 (로드는 브라우저가 동시에 진행)
+        print(f"[Yes24] 정렬별 탭 {len(YES24_SORTS)}개 로드 중...")
+        for sort_value, _ in YES24_SORTS:
+            before = set(driver.window_handles)
+            driver.execute_script("window.open(arguments[0], '_blank');", url)
+            tabs[sort_value] = (set(driver.window_handles) - before).pop()
+
+        # 2. 목록이 보이는 탭부터 정렬 클릭 (갱신 완료는 기다리지 않음)
+        for sort_value, _ in YES24_SORTS:
+            driver.switch_to.window(tabs[sort_value])
+            WebDriverWait(driver, 15).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, "li[data-goods-no]"))
+            )
+            start_click_watch(driver, f"a[data-search-value='{sort_value}']", "li[data-goods-no]", max_wait * 1000)
+
+        # 3. 탭별 결과 수집 (이미 끝난 탭은 바로 반환됨)
+        for sort_value, sort_name in YES24_SORTS:
+            if cancel.is_set():
+                break
+            driver.switch_to.window(tabs[sort_value])
+            result = collect_click_watch(driver, max_wait * 1000)
+            if result["status"] == "no_button":
+                print(f"[Yes24] {sort_name} 정렬 버튼 없음")
+                continue
+            print(f"[Yes24] {sort_name} 탭 정렬 {result['status']} ({result['elapsed_ms'] / 1000:.2f}초)")
+            if sort_value == "REG_DTS":
+                # 스크롤해서 더 많은 상품 로드 (더 이상 늘지 않으면 중단)
+                for _ in range(3):
+                    if scroll_and_wait_for_items(driver, "li[data-goods-no]")["status"] != "changed":
+                        break
+            views[sort_name] = parse_yes24_products(driver.page_source)
 
-        # 3. 판매량순 정렬 (재입고 체크용)
-        if click_sort_and_wait(driver, "SALE_SCO", "판매량순"):
-            sale_products = parse_products_from_page()
-            process_products(sale_products, "판매량순")
+        print(f"[Yes24] 탭 병렬 조회 완료 ({time.time() - start_time:.1f}초)")
+        return views
+
+    finally:
+        # 풀에 돌려줄 드라이버는 원래 탭 하나만 남김
+        for handle in tabs.values():
+            try:
+                driver.switch_to.window(handle)
+                driver.close()
+            except Exception:
+                pass
+        driver.switch_to.window(main_handle)
+
+
+def fetch_yes24_products(pool, site_saved, cancel):
+    """Yes24에서 상품 목록 가져오기 (신상품순 + 등록일순 + 판매량순)
+
+    HTTP로 먼저 조회하고, 차단되거나 비어 있을 때만 풀에서 드라이버를 빌려 브라우저로 조회합니다.
+    """
+    products = {}
+
+    def process_products(page_products, label, changed=True):
+        """정렬/페이지별 결과 병합 (먼저 처리한 쪽 우선, 변경 감지는 사이트 단위로 한 번)"""
+        print(f"[Yes24] {label}: {len(page_products)}개{'' if changed else ' (변경 없음)'}")
+        VIEW_SCHEDULER.observe(f"yes24:{label}", page_products)
+        PAGE_CACHE.mark("yes24", changed)
+
+        for pid, prod in page_products.items():
+            if pid not in products:
+                products[pid] = prod
+
+    try:
+        result = fetch_yes24_views_http(site_saved, cancel)
+        if cancel.is_set():
+            print("[Yes24] 시간 예산 초과로 조회 중단")
+            return None
+        if result is not None:
+            views, unchanged = result
+        else:
+            unchanged = set()
+            print(f"[Yes24] HTTP 조회 실패, 브라우저로 전환")
+            with pool.driver() as driver:
+                views = None
+                if YES24_PARALLEL_TABS:
+                    try:
+                        views = fetch_yes24_views_tabs(driver, cancel)
+                    except Exception as e:
+                        print(f"[Yes24] 탭 병렬 조회 실패, 순차 조회로 전환: {e}")
+                if views is None:
+                    views = fetch_yes24_views_selenium(driver, cancel)
+            if cancel.is_set():
+                print("[Yes24] 시간 예산 초과로 조회 중단")
+                return None
+
+        # 정렬 순서대로 처리 (먼저 나온 정렬의 상품 정보 우선)
+        for _, sort_name in YES24_SORTS:
+            if sort_name in views:
+                process_products(views[sort_name], sort_name, sort_name not in unchanged)
 
         return products
 
@@ -275,193 +573,168 @@ def fetch_yes24_products(driver, saved_products, is_first_run):
         return products if products else None
 
 
-def fetch_aladin_products(saved_products, is_first_run):
-    """알라딘에서 상품 목록 가져오기 (출시일순 + 등록일순 + 리뷰순 2페이지)"""
-    products = {}
-    site_key = "aladin"
-    site_saved = saved_products.get(site_key, {})
-
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-        'Accept-Language': 'ko-KR,ko;q=0.9',
-    }
-
-    def parse_products_from_html(html):
-        soup = BeautifulSoup(html, "html.parser")
-        page_products = {}
-
-        # 방법 1: ss_book_box (책 카테고리)
-        boxes = soup.select("div.ss_book_box")
-
-        # 방법 2: ss_book_box가 없으면 ItemId 링크를 기준으로 파싱 (음악 카테고리)
-        if not boxes:
-            # 모든 ItemId 링크를 찾아서 부모 요소를 box로 사용
-            item_links = soup.select('a[href*="ItemId="]')
-            seen_ids = set()
-            for link in item_links:
-                href = link.get("href", "")
-                match = re.search(r"ItemId=(\d+)", href)
-                if match and match.group(1) not in seen_ids:
-                    seen_ids.add(match.group(1))
-                    # 부모를 3-5단계 올라가서 상품 컨테이너 찾기
-                    parent = link
-                    for _ in range(5):
-                        if parent.parent:
-                            parent = parent.parent
-                            # 텍스트가 충분히 많으면 상품 컨테이너로 간주
-                            if len(parent.get_text()) > 50:
-                                break
-                    boxes.append(parent)
-
-        for box in boxes:
-            try:
-                title_link = box.select_one("a.bo3")
-                if not title_link:
-                    title_link = box.select_one('a[href*="ItemId="]')
-
-                if not title_link:
-                    continue
-
-                href = title_link.get("href", "")
-                match = re.search(r"ItemId=(\d+)", href)
-                if not match:
-                    continue
-
-                product_id = match.group(1)
-                if product_id in page_products:
-                    continue
-
-                title = title_link.get_text(strip=True)
-
-                price_tag = box.select_one("span.ss_p2")
-                price = price_tag.get_text(strip=True) if price_tag else ""
-                # 가격이 없으면 다른 방식으로 찾기
-                if not price:
-                    price_match = re.search(r"(\d{1,3}(?:,\d{3})*)\s*원", box.get_text())
-                    if price_match:
-                        price = price_match.group(1) + "원"
-
-                img_tag = box.select_one('img[src*="image.aladin.co.kr"]')
-                img_url = ""
-                if img_tag:
-                    img_url = img_tag.get("src", "")
-                    img_url = img_url.replace("coversum", "cover200")
-
-                # 품절 여부 확인 (다양한 방식으로 체크)
-                box_text = box.get_text()
-                box_html = str(box).lower()
-                is_soldout = (
-                    "품절" in box_text
-                    or "절판" in box_text
-                    or "일시품절" in box_text
-                    or "구매불가" in box_text
-                    or "재입고 알림" in box_text  # 재입고 알림 버튼이 있으면 품절
-                    or "유통이 중단" in box_text  # 유통 중단 메시지
-                    or "soldout" in box_html
-                    or "sold_out" in box_html
-                    or "sold-out" in box_html
-                    or box.select_one('[class*="soldout"]') is not None
-                    or box.select_one('[class*="품절"]') is not None
-                    or box.select_one('img[alt*="품절"]') is not None
-                    or box.select_one('img[src*="soldout"]') is not None
-                )
+def parse_aladin_products(html, backend=None, scoped=True):
+    """알라딘 목록 HTML에서 상품 파싱"""
+    root = parse_html(html, backend, SITES["aladin"]["scope"] if scoped else None)
+    page_products = {}
+
+    # 방법 1: ss_book_box (책 카테고리)
+    boxes = root.select("div.ss_book_box")
+
+    # 방법 2: ss_book_box가 없으면 ItemId 링크를 기준으로 파싱 (음악 카테고리)
+    if not boxes:
+        # 모든 ItemId 링크를 찾아서 부모 요소를 box로 사용
+        item_links = root.select('a[href*="ItemId="]')
+        seen_ids = set()
+        for link in item_links:
+            href = link.get("href", "")
+            match = re.search(r"ItemId=(\d+)", href)
+            if match and match.group(1) not in seen_ids:
+                seen_ids.add(match.group(1))
+                # 부모를 3-5단계 올라가서 상품 컨테이너 찾기
+                parent = link
+                for _ in range(5):
+                    if parent.parent:
+                        parent = parent.parent
+                        # 텍스트가 충분히 많으면 상품 컨테이너로 간주
+                        if len(parent.text()) > 50:
+                            break
+                boxes.append(parent)
+
+    for box in boxes:
+        try:
+            title_link = box.select_one("a.bo3")
+            if not title_link:
+                title_link = box.select_one('a[href*="ItemId="]')
+
+            if not title_link:
+                continue
+
+            href = title_link.get("href", "")
+            match = re.search(r"ItemId=(\d+)", href)
+            if not match:
+                continue
 
-                if product_id and title:
-                    page_products[product_id] = {
-                        "title": title[:100],
-                        "price": price,
-                        "url": f"https://www.aladin.co.kr/shop/wproduct.aspx?ItemId={product_id}",
-                        "image": img_url,
-                        "soldout": is_soldout,
-                    }
-            except:
+            product_id = match.group(1)
+            if product_id in page_products:
                 continue
 
-        return page_products
+            title = title_link.text(strip=True)
 
-    def safe_request(url):
-        """Rate limit을 고려한 안전한 요청"""
+            price_tag = box.select_one("span.ss_p2")
+            price = parse_price(price_tag.text(strip=True)) if price_tag else None
+            # 가격이 없으면 다른 방식으로 찾기
+            if price is None:
+                price_match = re.search(r"(\d{1,3}(?:,\d{3})*)\s*원", box.text())
+                if price_match:
+                    price = parse_price(price_match.group(1))
+
+            img_tag = box.select_one('img[src*="image.aladin.co.kr"]')
+            img_url = ""
+            if img_tag:
+                img_url = img_tag.get("src", "")
+                img_url = img_url.replace("coversum", "cover200")
+
+            # 품절 여부 확인 (다양한 방식으로 체크)
+            is_soldout = SITES["aladin"]["soldout"].classify(box, product_id) is not None
+
+            if product_id and title:
+                page_products[product_id] = Product(
+                    Site.ALADIN,
+                    title[:100],
+                    f"https://www.aladin.co.kr/shop/wproduct.aspx?ItemId={product_id}",
+                    price,
+                    img_url,
+                    is_soldout,
+                )
+        except:
+            continue
+
+    return page_products
+
+
+def aladin_request(url, headers=None, max_attempts=3):
+    """속도 제한을 지키는 알라딘 요청 (429/503이면 Retry-After만큼 쉬고 재시도)"""
+    response = None
+    for attempt in range(max_attempts):
+        RATE_LIMITER.acquire(url)
         try:
-            response = requests.get(url, headers=headers, timeout=10)
-            if response.status_code == 429:
-                print(f"[알라딘] Rate limit 감지, 5초 대기...")
-                time.sleep(5)
-                response = requests.get(url, headers=headers, timeout=10)
-            return response
+            response = HTTP_CLIENT.get(url, headers=headers)
         except Exception as e:
             print(f"[알라딘] 요청 실패: {e}")
             return None
 
-    try:
-        base_url = "https://www.aladin.co.kr/shop/wbrowse.aspx?BrowseTarget=List&ViewRowsCount=25&ViewType=Detail&PublishMonth=0&page=1&PublishDay=84&CID=86800&SearchOption="
+        delay = RATE_LIMITER.on_response(url, response.status_code, response.headers.get("Retry-After"))
+        if response.status_code not in (429, 503):
+            return response
+        print(f"[알라딘] Rate limit 감지 ({attempt + 1}/{max_attempts}), {delay:.1f}초 후 재시도 "
+              f"(현재 속도 {RATE_LIMITER.current_rate(url):.2f}req/s)")
+    return response
 
-        # 1. 출시일순 (SortOrder=5)
-        print(f"[알라딘] 출시일순 조회...")
-        response = safe_request(base_url + "&SortOrder=5")
-        if response:
-            release_products = parse_products_from_html(response.text)
-            print(f"[알라딘] 출시일순: {len(release_products)}개")
 
-            # 즉시 알림
-            if not is_first_run:
-                for pid, prod in release_products.items():
-                    if pid not in site_saved and pid not in products:
-                        send_new_product_notification(site_key, {pid: prod})
-                    elif pid in site_saved and site_saved[pid].get("soldout") and not prod.get("soldout"):
-                        print(f"[알라딘] 재입고 감지: {prod['title'][:30]} (저장: soldout=True, 현재: soldout=False)")
-                        send_restock_notification(site_key, {pid: prod})
+def fetch_aladin_page(label, url, site_saved, cancel):
+    """알라딘 목록 한 페이지 조회 + 파싱
+
+    반환값: (상품, 변경 여부), 실패하면 None. 이전과 같은 페이지면 저장된 상품을 그대로 돌려줍니다.
+    """
+    if cancel.is_set():
+        return None
+    print(f"[알라딘] {label} 조회...")
+    cache_key = f"aladin:{label}"
+    response = aladin_request(url, PAGE_CACHE.request_headers(cache_key, site_saved))
+    if response is None or response.status_code >= 400:
+        return None
 
-            products.update(release_products)
+    cached = PAGE_CACHE.lookup(cache_key, response, site_saved, SITES["aladin"]["scope"])
+    if cached is not None:
+        return cached, False
 
-        time.sleep(1)  # 요청 간 딜레이
+    page_products = parse_aladin_products(response.text)
+    if cancel.is_set():
+        return None
+    PAGE_CACHE.update(cache_key, response, page_products)
+    return page_products, True
 
-        # 2. 등록일순 (SortOrder=6)
-        print(f"[알라딘] 등록일순 조회...")
-        response = safe_request(base_url + "&SortOrder=6")
-        if response:
-            register_products = parse_products_from_html(response.text)
-            print(f"[알라딘] 등록일순: {len(register_products)}개")
 
-            # 즉시 알림
-            if not is_first_run:
-                for pid, prod in register_products.items():
-                    if pid not in site_saved and pid not in products:
-                        send_new_product_notification(site_key, {pid: prod})
-                    elif pid in site_saved and site_saved[pid].get("soldout") and not prod.get("soldout"):
-                        print(f"[알라딘] 재입고 감지: {prod['title'][:30]} (저장: soldout=True, 현재: soldout=False)")
-                        send_restock_notification(site_key, {pid: prod})
-
-            for pid, prod in register_products.items():
-                if pid not in products:
-                    products[pid] = prod
-
-        time.sleep(1)  # 요청 간 딜레이
-
-        # 3. 리뷰순 (SortOrder=4) - 날짜 필터 없이 2페이지까지 (재입고 체크용)
-        review_base = "https://www.aladin.co.kr/shop/wbrowse.aspx?BrowseTarget=List&ViewRowsCount=25&ViewType=Detail&CID=86800&SortOrder=4"
-
-        for page in [1, 2]:
-            print(f"[알라딘] 리뷰순 {page}페이지 조회...")
-            response = safe_request(f"{review_base}&page={page}")
-            if response:
-                review_products = parse_products_from_html(response.text)
-                print(f"[알라딘] 리뷰순 {page}페이지: {len(review_products)}개")
-
-                # 즉시 알림 (재입고용)
-                if not is_first_run:
-                    for pid, prod in review_products.items():
-                        if pid not in site_saved and pid not in products:
-                            send_new_product_notification(site_key, {pid: prod})
-                        elif pid in site_saved and site_saved[pid].get("soldout") and not prod.get("soldout"):
-                            print(f"[알라딘] 재입고 감지: {prod['title'][:30]} (저장: soldout=True, 현재: soldout=False)")
-                            send_restock_notification(site_key, {pid: prod})
-
-                for pid, prod in review_products.items():
-                    if pid not in products:
-                        products[pid] = prod
-            time.sleep(1)  # 요청 간 딜레이
+def fetch_aladin_products(pool, site_saved, cancel):
+    """알라딘에서 상품 목록 가져오기 (출시일순 + 등록일순 + 리뷰순 2페이지)
+
+    네 페이지를 동시에 요청하고, 호스트별 토큰 버킷이 요청 간격을 조절합니다 (브라우저는 쓰지 않음).
+    """
+    products = {}
+
+    def process_products(page_products, label, changed=True):
+        """정렬/페이지별 결과 병합 (먼저 처리한 쪽 우선, 변경 감지는 사이트 단위로 한 번)"""
+        print(f"[알라딘] {label}: {len(page_products)}개{'' if changed else ' (변경 없음)'}")
+        VIEW_SCHEDULER.observe(f"aladin:{label}", page_products)
+        PAGE_CACHE.mark("aladin", changed)
+
+        for pid, prod in page_products.items():
+            if pid not in products:
+                products[pid] = prod
 
+    views = [(label, url) for label, url in ALADIN_VIEWS if VIEW_SCHEDULER.due(f"aladin:{label}")]
+    if not views:
+        return products
+
+    try:
+        start_time = time.time()
+        with ThreadPoolExecutor(max_workers=len(views)) as executor:
+            futures = [
+                (label, executor.submit(fetch_aladin_page, label, url, site_saved, cancel))
+                for label, url in views
+            ]
+
+            results = [(label, future.result()) for label, future in futures]
+        if cancel.is_set():
+            print("[알라딘] 시간 예산 초과로 조회 중단")
+            return None
+        # 앞에 있는 페이지의 상품 정보 우선 (완료 순서와 관계없이 목록 순서대로 처리)
+        for label, result in results:
+            if result is not None:
+                process_products(result[0], label, result[1])
+
+        print(f"[알라딘] {len(views)}페이지 조회 완료 ({time.time() - start_time:.1f}초)")
         return products
 
     except Exception as e:
@@ -469,77 +742,172 @@ def fetch_aladin_products(saved_products, is_first_run):
         return None
 
 
-def fetch_ktown4u_products(driver, saved_products, is_first_run):
-    """Ktown4u에서 상품 목록 가져오기"""
-    site_key = "ktown4u"
-    site_saved = saved_products.get(site_key, {})
+def parse_ktown4u_products(html, backend=None, scoped=True):
+    """Ktown4u 검색 페이지 HTML에서 상품 파싱"""
+    root = parse_html(html, backend, SITES["ktown4u"]["scope"] if scoped else None)
+    products = {}
 
-    try:
-        url = SITES["ktown4u"]["url"]
-        print(f"[Ktown4u] 페이지 로드 중...")
-        driver.get(url)
+    product_links = root.select('a[href*="/iteminfo?"]')
 
-        WebDriverWait(driver, 10).until(
-            lambda d: len(d.find_elements(By.CSS_SELECTOR, 'a[href*="/iteminfo?"]')) > 5
-        )
+    for link in product_links:
+        try:
+            href = link.get("href", "")
+            match = re.search(r"goods_no=(\d+)", href)
+            if not match:
+                continue
+
+            product_id = match.group(1)
+            if product_id in products:
+                continue
 
-        # 스크롤해서 더 많은 상품 로드
-        for _ in range(3):
-            driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(0.8)
+            img = link.select_one("img")
+            if not img:
+                continue
 
-        soup = BeautifulSoup(driver.page_source, "html.parser")
-        products = {}
+            title = img.get("alt", "")
+            if not title or "LP" not in title.upper():
+                continue
 
-        product_links = soup.select('a[href*="/iteminfo?"]')
+            img_url = img.get("src", "")
 
-        for link in product_links:
-            try:
-                href = link.get("href", "")
-                match = re.search(r"goods_no=(\d+)", href)
-                if not match:
-                    continue
+            link_text = link.text()
+            price_match = re.search(r"KRW\s*([\d,]+)", link_text)
+            price = parse_price(price_match.group(1)) if price_match else None
 
-                product_id = match.group(1)
-                if product_id in products:
-                    continue
+            is_soldout = SITES["ktown4u"]["soldout"].classify(link, product_id, link_text) is not None
 
-                img = link.select_one("img")
-                if not img:
-                    continue
+            products[product_id] = Product(
+                Site.KTOWN4U,
+                title[:100],
+                f"https://kr.ktown4u.com/iteminfo?goods_no={product_id}",
+                price,
+                img_url.replace("/thumbnail/", "/detail/") if img_url else "",
+                is_soldout,
+            )
+        except:
+            continue
 
-                title = img.get("alt", "")
-                if not title or "LP" not in title.upper():
-                    continue
+    return products
 
-                img_url = img.get("src", "")
 
-                link_text = link.get_text()
-                price_match = re.search(r"KRW\s*([\d,]+)", link_text)
-                price = ""
-                if price_match:
-                    price = price_match.group(1) + "원"
-
-                is_soldout = "품절" in link_text
-
-                prod = {
-                    "title": title[:100],
-                    "price": price,
-                    "url": f"https://kr.ktown4u.com/iteminfo?goods_no={product_id}",
-                    "image": img_url.replace("/thumbnail/", "/detail/") if img_url else "",
-                    "soldout": is_soldout,
-                }
-
-                # 즉시 알림
-                if not is_first_run:
-                    if product_id not in site_saved:
-                        send_new_product_notification(site_key, {product_id: prod})
-                    elif site_saved[product_id].get("soldout") and not is_soldout:
-                        send_restock_notification(site_key, {product_id: prod})
-
-                products[product_id] = prod
-            except:
-                continue
+def find_goods_list(data):
+    """검색 API 응답의 KTOWN4U_GOODS_PATH 위치에 있는 상품 목록 (형식이 다르면 None)"""
+    for key in KTOWN4U_GOODS_PATH:
+        if not isinstance(data, dict):
+            return None
+        data = data.get(key)
+    if not isinstance(data, list) or not all(isinstance(goods, dict) for goods in data):
+        return None
+    return data
+
+
+def parse_ktown4u_goods(goods):
+    """검색 API의 상품 항목을 Product로 변환 (LP가 아니면 None)"""
+    product_id = str(goods.get(KTOWN4U_FIELDS["id"]) or "")
+    title = str(goods.get(KTOWN4U_FIELDS["title"]) or "")
+    if not product_id.isdigit() or not title or "LP" not in title.upper():
+        return None
+
+    price = None
+    raw_price = goods.get(KTOWN4U_FIELDS["price"])
+    if raw_price not in (None, ""):
+        try:
+            price = int(float(str(raw_price).replace(",", "")))
+        except ValueError:
+            pass
+
+    soldout = goods.get(KTOWN4U_FIELDS["soldout"]) or False
+    if isinstance(soldout, str):
+        soldout = soldout.upper() in ("Y", "TRUE", "1", "SOLDOUT")
+
+    img_url = str(goods.get(KTOWN4U_FIELDS["image"]) or "")
+    if img_url.startswith("//"):
+        img_url = "https:" + img_url
+
+    return Product(
+        Site.KTOWN4U,
+        title[:100],
+        f"https://kr.ktown4u.com/iteminfo?goods_no={product_id}",
+        price,
+        img_url.replace("/thumbnail/", "/detail/") if img_url else "",
+        bool(soldout),
+    )
+
+
+def fetch_ktown4u_api():
+    """Ktown4u 검색 API를 페이지 순서대로 조회 (실패/빈 응답이면 None)"""
+    products = {}
+
+    for page in range(1, KTOWN4U_MAX_PAGES + 1):
+        params = dict(KTOWN4U_SEARCH_PARAMS, page=page, pageSize=KTOWN4U_PAGE_SIZE)
+        try:
+            response = HTTP_CLIENT.get(KTOWN4U_SEARCH_API, params=params, headers={"Accept": "application/json"})
+            goods_list = find_goods_list(response.json()) if response.status_code == 200 else None
+        except Exception as e:
+            print(f"[Ktown4u] 검색 API 요청 실패: {e}")
+            return None
+
+        if goods_list is None:
+            if page == 1:
+                print(f"[Ktown4u] 검색 API 응답 이상 (status={response.status_code})")
+                return None
+            break
+
+        before = len(products)
+        for goods in goods_list:
+            prod = parse_ktown4u_goods(goods)
+            pid = str(goods.get(KTOWN4U_FIELDS["id"]) or "")
+            if prod and pid not in products:
+                products[pid] = prod
+
+        # 마지막 페이지 (목록이 덜 찼거나 새 상품이 없음)
+        if len(goods_list) < KTOWN4U_PAGE_SIZE or len(products) == before:
+            break
+
+    return products if products else None
+
+
+def fetch_ktown4u_selenium(driver):
+    """Ktown4u 검색 페이지를 브라우저로 조회 (API 실패 시 대체 경로)"""
+    url = SITES["ktown4u"]["url"]
+    print(f"[Ktown4u] 페이지 로드 중...")
+    driver.get(url)
+
+    WebDriverWait(driver, 10).until(
+        lambda d: len(d.find_elements(By.CSS_SELECTOR, 'a[href*="/iteminfo?"]')) > 5
+    )
+
+    # 스크롤해서 더 많은 상품 로드
+    for _ in range(3):
+        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+        time.sleep(0.8)
+
+    return parse_ktown4u_products(driver.page_source)
+
+
+def fetch_ktown4u_products(pool, site_saved, cancel):
+    """Ktown4u에서 상품 목록 가져오기
+
+    KTOWN4U_SEARCH_API가 설정돼 있으면 검색 API(JSON)를 먼저 사용하고,
+    설정이 없거나 API가 실패하면 풀에서 드라이버를 빌려 브라우저로 조회합니다.
+    """
+    if not VIEW_SCHEDULER.due("ktown4u:검색"):
+        return {}
+
+    try:
+        products = None
+        if KTOWN4U_SEARCH_API:
+            products = fetch_ktown4u_api()
+            if products is None:
+                print(f"[Ktown4u] 검색 API 실패, 브라우저로 전환")
+        if products is None and not cancel.is_set():
+            with pool.driver() as driver:
+                products = fetch_ktown4u_selenium(driver)
+        if cancel.is_set():
+            print("[Ktown4u] 시간 예산 초과로 조회 중단")
+            return None
+        print(f"[Ktown4u] 검색 결과: {len(products)}개")
+        VIEW_SCHEDULER.observe("ktown4u:검색", products)
 
         return products
 
@@ -548,174 +916,563 @@ def fetch_ktown4u_products(driver, saved_products, is_first_run):
         return None
 
 
-def send_new_product_notification(site_key, new_products):
-    """신상품 알림 전송"""
+# 사이트별 조회/파싱 함수 - 새 사이트는 SITES 설정과 여기 한 줄만 추가하면 사이클에 포함됨
+SITE_FETCHERS = {
+    "yes24": (fetch_yes24_products, parse_yes24_products),
+    "aladin": (fetch_aladin_products, parse_aladin_products),
+    "ktown4u": (fetch_ktown4u_products, parse_ktown4u_products),
+}
+
+
+def build_scheduler():
+    """SITES 순서대로 사이트 어댑터 등록 (시간 예산은 SITE_BUDGET, 사이트별로 YES24_BUDGET 등)"""
+    scheduler = SiteScheduler()
+    for site_key, site in SITES.items():
+        if site_key not in SITE_FETCHERS:
+            continue
+        fetch, parse = SITE_FETCHERS[site_key]
+        budget = float(os.environ.get(f"{site_key.upper()}_BUDGET", SITE_BUDGET))
+        scheduler.register(SiteAdapter(site_key, site["name"], fetch, parse, budget))
+    scheduler.check(SITES)
+    return scheduler
+
+
+SCHEDULER = build_scheduler()
+
+
+def submit_outbox(event, keys, embeds, label):
+    """아웃박스 키와 임베드를 전송 큐에 넣고, 메시지 결과에 따라 전송 완료/재시도 표시"""
+    if not embeds:
+        return
+
+    def on_batch(start, end, ok, retryable=True):
+        if ok:
+            OUTBOX.mark_delivered(keys[start:end])
+        else:
+            OUTBOX.release(keys[start:end], retryable)
+
+    DISPATCHER.submit(EVENT_WEBHOOKS[event], embeds, label, on_batch)
+
+
+def queue_notifications(site_key, event, items, label):
+    """알림을 아웃박스에 먼저 기록한 뒤 전송 (이미 기록된 알림은 건너뜀)"""
+    keys, embeds = [], []
+    for product_id, product, embed in items:
+        key = OUTBOX.add(site_key, product_id, event, product, embed)
+        if key is None:
+            print(f"{label} 이미 기록된 알림 건너뜀: {product.title[:50]}")
+            continue
+        keys.append(key)
+        embeds.append(embed)
+    submit_outbox(event, keys, embeds, label)
+
+
+def resend_pending_notifications():
+    """이전 실행(또는 이전 사이클)에서 보내지 못한 알림 재전송"""
+    pending = {}
+    for key, embed in OUTBOX.claim_pending():
+        keys, embeds = pending.setdefault(key[2], ([], []))
+        keys.append(key)
+        embeds.append(embed)
+
+    for event, (keys, embeds) in pending.items():
+        webhook = EVENT_WEBHOOKS[event]
+        if not webhook:
+            OUTBOX.unclaim(keys)
+            continue
+        print(f"보내지 못한 {EVENT_NAMES[event]} 알림 {len(keys)}개 재전송")
+        submit_outbox(event, keys, embeds, f"[재전송] {EVENT_NAMES[event]}")
+
+
+def offers_field(releases, site_key, product_id):
+    """같은 음반의 사이트별 판매처 임베드 필드 (다른 사이트에 없으면 None)"""
+    if releases is None:
+        return None
+    offers = releases.offers(site_key, product_id)
+    if len({site for site, _, _ in offers}) < 2:
+        return None
+
+    # 구매 가능한 곳부터 낮은 가격 순
+    offers.sort(key=lambda offer: (offer[2].soldout, offer[2].price is None, offer[2].price or 0))
+    lines = []
+    for site, _, product in offers[:MAX_OFFERS]:
+        price = "품절" if product.soldout else (product.price_display or "가격 정보 없음")
+        lines.append(f"[{SITES[site]['name']}]({product.url}) {price}")
+    return {"name": "판매처", "value": "\n".join(lines), "inline": False}
+
+
+def joined_field(releases, site_key, product_id, event, label):
+    """이번 사이클에 다른 사이트에서도 같은 판이 나왔으면 그 사이트 링크 필드 (알림을 하나로 합침)"""
+    if releases is None:
+        return None
+    joined = releases.joined(site_key, product_id, event)
+    if not joined:
+        return None
+    lines = [
+        f"[{SITES[site]['name']}]({product.url}) {product.price_display or '가격 정보 없음'}"
+        for site, _, product in joined
+    ]
+    return {"name": label, "value": "\n".join(lines), "inline": False}
+
+
+def send_new_product_notification(site_key, new_products, releases=None):
+    """신상품 알림 전송 (메시지당 최대 10개씩 묶어서, 같은 판은 먼저 알린 사이트 알림에 합침)"""
+    if not new_products:
+        return
     if not DISCORD_WEBHOOK_NEW:
         print("신상품 Discord webhook URL이 설정되지 않았습니다.")
         return
 
     site = SITES[site_key]
+    items = []
 
     for product_id, product in new_products.items():
-        is_soldout = product.get("soldout", False)
+        if releases is not None and not releases.claim(site_key, product_id, "new"):
+            print(f"[{site['name']}] 신상품 알림 생략 (다른 사이트 알림에 포함): {product.title[:50]}")
+            continue
+
+        is_soldout = product.soldout
         title_prefix = "🎵 새 LP 등록!"
         if is_soldout:
             title_prefix = "🎵 새 LP 등록! [품절]"
 
         embed = {
-            "embeds": [
-                {
-                    "title": f"{title_prefix} [{site['name']}]",
-                    "description": product["title"],
-                    "url": product["url"],
-                    "color": 0x808080 if is_soldout else site["color"],
-                    "fields": [],
-                    "footer": {"text": f"{site['name']} LP"},
-                    "timestamp": datetime.now(timezone.utc).isoformat(),
-                }
-            ]
+            "title": f"{title_prefix} [{site['name']}]",
+            "description": product.title,
+            "url": product.url,
+            "color": 0x808080 if is_soldout else site["color"],
+            "fields": [],
+            "footer": {"text": f"{site['name']} LP"},
+            "timestamp": datetime.now(timezone.utc).isoformat(),
         }
 
-        if product["price"]:
-            price_display = product["price"]
+        if product.price is not None:
+            price_display = product.price_display
             if is_soldout:
-                price_display = f"~~{product['price']}~~ (품절)"
-            embed["embeds"][0]["fields"].append(
+                price_display = f"~~{product.price_display}~~ (품절)"
+            embed["fields"].append(
                 {"name": "가격", "value": price_display, "inline": True}
             )
 
-        if product["image"]:
-            embed["embeds"][0]["thumbnail"] = {"url": product["image"]}
+        joined = joined_field(releases, site_key, product_id, "new", "다른 사이트에도 등록")
+        if joined:
+            embed["fields"].append(joined)
 
-        try:
-            response = requests.post(DISCORD_WEBHOOK_NEW, json=embed, timeout=10)
-            if response.status_code == 204:
-                print(f"[{site['name']}] 신상품 알림 전송: {product['title'][:50]}")
-            else:
-                print(f"[{site['name']}] 알림 전송 실패: {response.status_code}")
-            time.sleep(0.5)
-        except Exception as e:
-            print(f"[{site['name']}] Discord 전송 오류: {e}")
+        offers = offers_field(releases, site_key, product_id)
+        if offers:
+            embed["fields"].append(offers)
+
+        if product.image:
+            embed["thumbnail"] = {"url": product.image}
+
+        items.append((product_id, product, embed))
+        print(f"[{site['name']}] 신상품 알림: {product.title[:50]}")
+
+    queue_notifications(site_key, "new", items, f"[{site['name']}] 신상품")
 
 
 def is_restock_excluded(product_id, title):
     """재입고 알림 제외 대상인지 확인"""
-    if product_id in RESTOCK_EXCLUDE["ids"]:
-        return True
-    for keyword in RESTOCK_EXCLUDE["keywords"]:
-        if keyword.lower() in title.lower():
-            return True
-    return False
+    return RESTOCK_EXCLUDE.match(product_id, title) is not None
 
 
-def send_restock_notification(site_key, restocked_products):
-    """재입고 알림 전송"""
+def send_restock_notification(site_key, restocked_products, releases=None):
+    """재입고 알림 전송 (메시지당 최대 10개씩 묶어서, 같은 판은 먼저 알린 사이트 알림에 합침)"""
+    if not restocked_products:
+        return
     if not DISCORD_WEBHOOK_RESTOCK:
         print("재입고 Discord webhook URL이 설정되지 않았습니다.")
         return
 
     site = SITES[site_key]
+    items = []
 
     for product_id, product in restocked_products.items():
         # 제외 대상 확인
-        if is_restock_excluded(product_id, product.get("title", "")):
-            print(f"[{site['name']}] 재입고 알림 제외: {product['title'][:50]}")
+        if is_restock_excluded(product_id, product.title):
+            print(f"[{site['name']}] 재입고 알림 제외: {product.title[:50]}")
+            continue
+        if releases is not None and not releases.claim(site_key, product_id, "restock"):
+            print(f"[{site['name']}] 재입고 알림 생략 (다른 사이트 알림에 포함): {product.title[:50]}")
             continue
 
         embed = {
-            "embeds": [
-                {
-                    "title": f"🎉 LP 재입고! [{site['name']}]",
-                    "description": product["title"],
-                    "url": product["url"],
-                    "color": site["color"],
-                    "fields": [],
-                    "footer": {"text": f"{site['name']} LP 재입고"},
-                    "timestamp": datetime.now(timezone.utc).isoformat(),
-                }
-            ]
+            "title": f"🎉 LP 재입고! [{site['name']}]",
+            "description": product.title,
+            "url": product.url,
+            "color": site["color"],
+            "fields": [],
+            "footer": {"text": f"{site['name']} LP 재입고"},
+            "timestamp": datetime.now(timezone.utc).isoformat(),
         }
 
-        if product["price"]:
-            embed["embeds"][0]["fields"].append(
-                {"name": "가격", "value": product["price"], "inline": True}
+        if product.price is not None:
+            embed["fields"].append(
+                {"name": "가격", "value": product.price_display, "inline": True}
             )
 
-        if product["image"]:
-            embed["embeds"][0]["thumbnail"] = {"url": product["image"]}
+        joined = joined_field(releases, site_key, product_id, "restock", "다른 사이트에도 재입고")
+        if joined:
+            embed["fields"].append(joined)
 
-        try:
-            response = requests.post(DISCORD_WEBHOOK_RESTOCK, json=embed, timeout=10)
-            if response.status_code == 204:
-                print(f"[{site['name']}] 재입고 알림 전송: {product['title'][:50]}")
-            else:
-                print(f"[{site['name']}] 알림 전송 실패: {response.status_code}")
-            time.sleep(0.5)
-        except Exception as e:
-            print(f"[{site['name']}] Discord 전송 오류: {e}")
+        offers = offers_field(releases, site_key, product_id)
+        if offers:
+            embed["fields"].append(offers)
 
+        if product.image:
+            embed["thumbnail"] = {"url": product.image}
 
-def main():
-    # 랜덤 딜레이 (0~15초) - 봇 패턴 회피
-    delay = random.randint(0, 15)
-    print(f"[{datetime.now()}] 랜덤 딜레이: {delay}초")
-    time.sleep(delay)
+        items.append((product_id, product, embed))
+        print(f"[{site['name']}] 재입고 알림: {product.title[:50]}")
+
+    queue_notifications(site_key, "restock", items, f"[{site['name']}] 재입고")
+
+
+def send_price_drop_notification(site_key, drops, releases=None):
+    """가격 인하 알림 전송 (drops: {상품 ID: (상품, PriceChange)})"""
+    if not drops or not DISCORD_WEBHOOK_PRICE:
+        return
+
+    site = SITES[site_key]
+    items = []
+
+    for product_id, (product, change) in drops.items():
+        # 품절 상품은 가격이 내려가도 살 수 없으므로 제외
+        if product.soldout:
+            continue
+
+        drop = change.previous - change.price
+        embed = {
+            "title": f"💸 LP 가격 인하! [{site['name']}]",
+            "description": product.title,
+            "url": product.url,
+            "color": site["color"],
+            "fields": [
+                {"name": "가격", "value": f"~~{format_price(change.previous)}~~ → {product.price_display}", "inline": True},
+                {"name": "인하", "value": f"-{format_price(drop)} ({drop * 100 / change.previous:.0f}%)", "inline": True},
+            ],
+            "footer": {"text": f"{site['name']} LP 가격 인하"},
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+        }
+
+        if change.lowest is not None:
+            lowest = "최저가 경신!" if change.price < change.lowest else format_price(change.lowest)
+            embed["fields"].append({"name": "이전 최저가", "value": lowest, "inline": True})
 
-    print(f"[{datetime.now()}] LP 통합 모니터링 시작 (신상품 + 재입고)...")
+        offers = offers_field(releases, site_key, product_id)
+        if offers:
+            embed["fields"].append(offers)
+
+        if product.image:
+            embed["thumbnail"] = {"url": product.image}
+
+        items.append((product_id, product, embed))
+        print(f"[{site['name']}] 가격 인하 알림: {product.title[:50]} ({format_price(change.previous)} → {product.price_display})")
+
+    queue_notifications(site_key, "price", items, f"[{site['name']}] 가격 인하")
+
+
+def record_prices(site_key, events):
+    """신상품/가격 변경 이벤트의 가격을 이력에 기록하고, 알림 기준을 넘는 인하만 반환"""
+    drops = {}
+    for event in events:
+        if event.type not in (EventType.NEW, EventType.PRICE):
+            continue
+        previous = event.previous.price if event.previous is not None else None
+        change = PRICE_HISTORY.record(site_key, event.product_id, event.product.price, previous)
+        if change is not None and PRICE_DROP_RULE.check(change):
+            drops[event.product_id] = (event.product, change)
+    return drops
+
+
+def send_release_notifications(notices, releases):
+    """사이트별 신상품/재입고 알림 전송 ({사이트: group_events 결과})
+
+    모든 사이트의 알림 대상을 먼저 음반별로 맡긴 뒤 보내므로, 같은 판이 여러 사이트에서 함께 나오면
+    먼저 맡은 사이트 알림 하나에 나머지 사이트 링크가 들어갑니다.
+    """
+    for site_key, grouped in notices.items():
+        for product_id in grouped[EventType.NEW]:
+            releases.claim(site_key, product_id, "new")
+        for product_id, product in grouped[EventType.RESTOCK].items():
+            if not is_restock_excluded(product_id, product.title):
+                releases.claim(site_key, product_id, "restock")
+
+    for site_key, grouped in notices.items():
+        send_new_product_notification(site_key, grouped[EventType.NEW], releases)
+        send_restock_notification(site_key, grouped[EventType.RESTOCK], releases)
+
+
+def report_changes(site_key, site_saved, current_products, is_first_run, releases=None):
+    """사이트 스냅샷과 저장된 상품을 비교해 가격 인하 알림 전송, 이벤트 목록 반환
+
+    신상품/재입고 알림은 모든 사이트를 비교한 뒤 send_release_notifications()로 보냅니다.
+    """
+    # 아카이브로 옮겨진 상품이 다시 나오면 되살려서 재입고 여부를 비교
+    RETENTION.recall(site_key, site_saved, current_products)
+
+    events = diff_site(site_key, site_saved, current_products)
+    if events:
+        print(f"[{SITES[site_key]['name']}] 변경 감지: {summarize(events)}")
+    # 가격 이력은 첫 실행에도 기록 (첫 가격이 이후 비교 기준)
+    drops = record_prices(site_key, events)
+    if is_first_run:
+        return events
+
+    # 알림 대상 이벤트가 나온 뷰 집계 (뷰별 조회 간격 조절용)
+    VIEW_SCHEDULER.credit(site_key, [event.product_id for event in events if event.type is not EventType.SOLDOUT])
+
+    send_price_drop_notification(site_key, drops, releases)
+    return events
+
+
+def run_cycle(state):
+    """모니터링 1회 실행 (조회 → 알림 → 변경분 저장)
+
+    state에 담긴 드라이버 풀과 상품 목록은 데몬 모드에서 사이클 간에 재사용됩니다.
+    """
+    print(f"[{datetime.now()}] LP 통합 모니터링 시작 (신상품 + 재입고, 파서: {resolve_backend()})...")
     start_time = time.time()
 
-    saved_products = load_saved_products()
+    saved_products = state["saved_products"]
     is_first_run = all(not saved_products.get(site, {}) for site in SITES.keys())
 
     if is_first_run:
         print("첫 실행 - 상품 목록만 저장하고 알림은 보내지 않습니다.")
 
-    results = {}
-    driver = None
+    # 제외 목록 파일이 바뀌었으면 다시 불러옴 (데몬 모드에서 재시작 없이 반영)
+    RESTOCK_EXCLUDE.maybe_reload()
 
-    try:
-        # 병렬 실행: 알라딘(requests)과 Selenium 작업 동시 실행
-        with ThreadPoolExecutor(max_workers=2) as executor:
-            # 알라딘은 requests로 별도 스레드에서 실행
-            aladin_future = executor.submit(fetch_aladin_products, saved_products, is_first_run)
+    # 이전에 보내지 못한 알림부터 전송 큐에 넣음
+    resend_pending_notifications()
+
+    # 모든 사이트 동시 조회 (HTTP 우선, 브라우저는 실패 시에만 풀에서 대여) - 사이클 시간은 가장 느린 사이트에 맞춰짐
+    results = SCHEDULER.run(state["pool"], saved_products)
+
+    # 사이트 간 같은 음반 묶기 (알림에 판매처를 함께 표시하고 같은 판은 사이트마다 따로 알리지 않고 한 알림에 합침)
+    releases = ReleaseIndex(RELEASES_FILE)
+    releases.add_all(results)
+    print(f"{releases.summary()}")
 
-            # Selenium 작업 (Yes24 + Ktown4u)
-            driver = create_driver()
+    # 결과 집계: 사이트별로 저장된 상품과 한 번 비교해 알림 전송 후 병합
+    today = date.today().isoformat()
+    changed = 0
+    notices = {}
+    for site_key, current_products in results.items():
+        site = SITES[site_key]
+        site_saved = saved_products.get(site_key, {})
 
-            yes24_products = fetch_yes24_products(driver, saved_products, is_first_run)
-            if yes24_products:
-                results["yes24"] = yes24_products
+        print(f"[{site['name']}] 조회 완료: {len(current_products)}개")
 
-            ktown4u_products = fetch_ktown4u_products(driver, saved_products, is_first_run)
-            if ktown4u_products:
-                results["ktown4u"] = ktown4u_products
+        if PAGE_CACHE.unchanged(site_key):
+            # 모든 뷰가 지난번과 같은 페이지면 상품도 저장된 그대로라 비교/알림 생략
+            print(f"[{site['name']}] 목록 변경 없음 - 비교 생략")
+        else:
+            events = report_changes(site_key, site_saved, current_products, is_first_run, releases)
+            if not is_first_run:
+                notices[site_key] = group_events(events)
+
+        # 상품 데이터 업데이트 (바뀐 상품만 카운트, last_seen은 날짜 단위라 하루 한 번만 바뀜)
+        for pid, prod in current_products.items():
+            old = site_saved.get(pid)
+            record = RETENTION.touch(old, prod, today)
+            if old != record:
+                site_saved[pid] = record
+                changed += 1
+        saved_products[site_key] = site_saved
+
+    # 신상품/재입고 알림은 모든 사이트를 비교한 뒤 판별로 한 번에 전송
+    send_release_notifications(notices, releases)
+
+    # 보존 기간이 지난 상품은 하루 한 번 아카이브로 이동 (한 번씩 실행하는 Actions에서도 하루 한 번이 되도록
+    # 마지막 실행 날짜는 아카이브 DB에 기록, state는 데몬 모드에서 DB 조회를 줄이는 용도)
+    if state.get("retention_day") != today:
+        archived, stamped = RETENTION.evict(saved_products, today)
+        state["retention_day"] = today
+        changed += archived + stamped
+        if archived:
+            print(f"[{datetime.now()}] {RETENTION_DAYS}일 이상 보이지 않은 상품 {archived}개를 아카이브로 이동")
+
+    # 변경분이 있을 때만 저장
+    if changed:
+        save_products(saved_products)
+        print(f"[{datetime.now()}] 저장 완료 - 변경 {changed}개")
+    RETENTION.commit()
+    PRICE_HISTORY.commit()
+
+    # 상품 목록에 반영된 뒤에는 전송 완료 기록이 필요 없음 (다시 감지되지 않음)
+    purged = OUTBOX.purge_delivered()
+    if purged:
+        print(f"[{datetime.now()}] 아웃박스 정리: 전송 완료 {purged}건 삭제")
+
+    # 취소한 조회가 남아 있으면 멈출 때까지 기다린 뒤 페이지 지문/뷰 기록 저장 (다음 사이클에 섞이지 않도록)
+    SCHEDULER.wait_idle(SITE_DRAIN_TIMEOUT)
+
+    # 페이지 지문은 상품 목록이 저장된 뒤에 저장 (중간에 실패하면 다음 실행에서 다시 비교)
+    PAGE_CACHE.save()
+    releases.save()
+    VIEW_SCHEDULER.commit()
+    VIEW_SCHEDULER.save()
+    print(f"[{datetime.now()}] 페이지 캐시: {PAGE_CACHE.summary()}")
+    PAGE_CACHE.reset_counts()
+
+    # 호스트별 연결 재사용 현황 (프로세스 시작 후 누적)
+    print(f"[{datetime.now()}] HTTP: {HTTP_CLIENT.summary()}")
+    print(f"[{datetime.now()}] 사이트별 조회: {SCHEDULER.summary()}")
+    SCHEDULER.reset()
+    if VIEW_SCHEDULER.enabled:
+        print(f"[{datetime.now()}] 뷰별 조회 간격: {VIEW_SCHEDULER.summary()}")
+    VIEW_SCHEDULER.reset()
+    print(f"[{datetime.now()}] 알림: {NOTIFIER.summary()}, 대기 {DISPATCHER.pending()}건, "
+          f"아웃박스 미전송 {OUTBOX.counts()['pending']}건")
+    NOTIFIER.reset()
+    if RETENTION.archived or RETENTION.recalled:
+        print(f"[{datetime.now()}] 보존 기간: {RETENTION.summary()}")
+    RETENTION.reset()
+    if PRICE_HISTORY.recorded:
+        print(f"[{datetime.now()}] {PRICE_HISTORY.summary()}")
+    PRICE_HISTORY.reset()
+
+    # 품절 판정 규칙별 적중 횟수 (오탐 확인용)
+    for site_key, site in SITES.items():
+        if site["soldout"].hits:
+            print(f"[{datetime.now()}] [{site['name']}] 품절 규칙: {site['soldout'].summary()}")
+        site["soldout"].reset()
+
+    elapsed = time.time() - start_time
+    print(f"[{datetime.now()}] 완료 - 소요시간: {elapsed:.1f}초")
+
+
+def new_state():
+    """사이클 간에 유지할 상태 (드라이버 풀 + 상품 목록)"""
+    # Chrome은 HTTP 조회가 실패해 브라우저 경로로 넘어갈 때 처음 빌리면서 기동
+    pool = DriverPool(create_driver, size=DRIVER_POOL_SIZE)
+    return {"pool": pool, "saved_products": load_saved_products()}
+
+
+def run_daemon(interval, jitter):
+    """프로세스를 유지하면서 지터를 준 주기로 사이클 반복"""
+    stop_event = threading.Event()
+
+    def handle_stop(signum, frame):
+        print(f"[{datetime.now()}] 종료 신호 수신 ({signum}), 현재 사이클 후 종료합니다.")
+        stop_event.set()
+
+    signal.signal(signal.SIGTERM, handle_stop)
+    signal.signal(signal.SIGINT, handle_stop)
+
+    state = new_state()
+    print(f"[{datetime.now()}] 데몬 모드 시작 - 주기 {interval}초 (±{jitter}초)")
 
-            # 알라딘 결과 수집
-            aladin_products = aladin_future.result()
-            if aladin_products:
-                results["aladin"] = aladin_products
+    try:
+        while not stop_event.is_set():
+            cycle_start = time.time()
+            try:
+                run_cycle(state)
+            except Exception as e:
+                print(f"[{datetime.now()}] 사이클 실패: {e}")
+
+            # 브라우저 경로를 한 번 쓴 뒤에는 드라이버를 띄워 둔 채 유지 (폐기된 드라이버는 대기 중에 다시 기동)
+            if state["pool"].stats["created"]:
+                state["pool"].warm_up()
+
+            # 사이클 시작 시점 기준으로 다음 실행까지 대기 (다음 차례인 뷰가 더 빨리 오면 앞당김)
+            period = interval
+            until_next = VIEW_SCHEDULER.until_next()
+            if until_next is not None:
+                period = min(interval, max(VIEW_SCHEDULER.min_interval, (time.time() - cycle_start) + until_next))
+            wait = period + random.uniform(-jitter, jitter) - (time.time() - cycle_start)
+            if wait > 0:
+                print(f"[{datetime.now()}] 다음 사이클까지 {wait:.1f}초 대기")
+                stop_event.wait(wait)
+    finally:
+        # 남은 조회를 먼저 멈춰야 닫힌 드라이버 풀/DB를 쓰지 않음
+        SCHEDULER.close(SITE_DRAIN_TIMEOUT)
+        drain_notifications()
+        state["pool"].close()
+        if STORE is not None:
+            STORE.close()
+        RETENTION.archive.close()
+        PRICE_HISTORY.close()
+
+
+def drain_notifications():
+    """종료 전에 큐에 남은 알림을 기한 내에 전송"""
+    if DISPATCHER.pending():
+        print(f"[{datetime.now()}] 남은 알림 {DISPATCHER.pending()}건 전송 대기 (최대 {NOTIFY_DRAIN_TIMEOUT:.0f}초)")
+    left = DISPATCHER.drain(NOTIFY_DRAIN_TIMEOUT)
+    if left:
+        print(f"[{datetime.now()}] 알림 {left}건을 보내지 못하고 종료합니다 (다음 실행에서 재전송).")
+    print(f"[{datetime.now()}] 알림: {NOTIFIER.summary()}, 큐 초과로 버림 {DISPATCHER.dropped}, 전송 포기 {OUTBOX.dropped}")
+    OUTBOX.close()
+
+
+def verify_parser(site_key, html_file):
+    """저장된 페이지로 파서 백엔드 간 결과/속도 비교"""
+    parse = SCHEDULER[site_key].parse
+    with open(html_file, "r", encoding="utf-8") as f:
+        html = f.read()
+
+    # 기준: 범위 제한 없이 BeautifulSoup으로 파싱한 결과
+    baseline = parse(html, backend="bs4", scoped=False)
+    report = compare_backends(parse, html, baseline=baseline)
+    for name, result in report.items():
+        status = "일치" if not result["diff"] else f"불일치 {len(result['diff'])}개: {result['diff'][:5]}"
+        print(f"[{name}] {result['count']}개, {result['seconds'] * 1000:.1f}ms, {status}")
+    if any(result["diff"] for result in report.values()):
+        raise SystemExit(1)
 
-        # 결과 집계 (알림은 이미 즉시 전송됨)
-        for site_key, current_products in results.items():
-            site = SITES[site_key]
-            site_saved = saved_products.get(site_key, {})
 
-            print(f"[{site['name']}] 조회 완료: {len(current_products)}개")
+def main():
+    parser = argparse.ArgumentParser(description="LP 통합 모니터링")
+    parser.add_argument("--daemon", action="store_true", help="프로세스를 유지하며 주기적으로 실행")
+    parser.add_argument("--interval", type=float, default=DAEMON_INTERVAL, help="데몬 모드 실행 주기(초)")
+    parser.add_argument("--jitter", type=float, default=DAEMON_JITTER, help="실행 주기 랜덤 편차(초)")
+    parser.add_argument(
+        "--export-json", metavar="FILE",
+        help="SQLite 저장소(LP_STORE=sqlite)의 상품 목록을 products.json 형식으로 내보내기",
+    )
+    parser.add_argument(
+        "--verify-parser", nargs=2, metavar=("SITE", "HTML_FILE"),
+        help="저장된 페이지를 파서 백엔드별로 파싱해 결과가 같은지 확인",
+    )
+    args = parser.parse_args()
 
-            # 상품 데이터 업데이트
-            for pid, prod in current_products.items():
-                site_saved[pid] = prod
-            saved_products[site_key] = site_saved
+    if args.verify_parser:
+        verify_parser(*args.verify_parser)
+        return
 
-        # 저장
-        save_products(saved_products)
+    if args.export_json:
+        if STORE is None:
+            parser.error("--export-json은 LP_STORE=sqlite일 때만 사용할 수 있습니다.")
+        print(f"상품 {STORE.export_json(args.export_json, SITES.keys())}개를 {args.export_json}에 저장했습니다.")
+        return
 
-        elapsed = time.time() - start_time
-        print(f"[{datetime.now()}] 완료 - 소요시간: {elapsed:.1f}초")
+    if args.daemon:
+        run_daemon(args.interval, args.jitter)
+        return
+
+    # 한 번만 실행하는 경우(Actions 등)는 외부에서 정한 주기로 실행되므로 뷰를 건너뛰지 않음
+    if "ADAPTIVE_POLLING" not in os.environ:
+        VIEW_SCHEDULER.enabled = False
+
+    state = new_state()
+    try:
+        # 랜덤 딜레이 (0~15초) - 봇 패턴 회피
+        delay = random.randint(0, 15)
+        print(f"[{datetime.now()}] 랜덤 딜레이: {delay}초")
+        time.sleep(delay)
 
+        run_cycle(state)
     finally:
-        if driver:
-            driver.quit()
+        # 남은 조회를 먼저 멈춰야 닫힌 드라이버 풀/DB를 쓰지 않음
+        SCHEDULER.close(SITE_DRAIN_TIMEOUT)
+        drain_notifications()
+        state["pool"].close()
+        if STORE is not None:
+            STORE.close()
+        RETENTION.archive.close()
+        PRICE_HISTORY.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,223 @@
+"""
+Discord 웹훅 알림 전송
+임베드를 메시지당 최대 10개씩 묶어 보내고, X-RateLimit-* 헤더와 429 응답의 retry_after를 지키며
+일시적인 오류는 지수 백오프로 재시도합니다. 사이클마다 전송/실패 개수를 집계합니다.
+NotificationDispatcher는 전송을 백그라운드 스레드로 넘겨 스크래핑이 Discord 응답을 기다리지 않게 합니다.
+"""
+
+import queue
+import random
+import threading
+import time
+
+# Discord 제한: 메시지당 임베드 10개, 임베드 글자 수 합계 6000자
+MAX_EMBEDS = 10
+MAX_EMBED_CHARS = 6000
+
+
+def embed_chars(embed):
+    """Discord가 글자 수 제한에 포함하는 필드 길이 합계"""
+    total = len(embed.get("title", "")) + len(embed.get("description", ""))
+    total += len(embed.get("footer", {}).get("text", ""))
+    for field in embed.get("fields", []):
+        total += len(field.get("name", "")) + len(field.get("value", ""))
+    return total
+
+
+def pack_embeds(embeds, max_embeds=MAX_EMBEDS, max_chars=MAX_EMBED_CHARS):
+    """임베드를 메시지 단위로 묶기"""
+    batch, chars = [], 0
+    for embed in embeds:
+        size = embed_chars(embed)
+        if batch and (len(batch) >= max_embeds or chars + size > max_chars):
+            yield batch
+            batch, chars = [], 0
+        batch.append(embed)
+        chars += size
+    if batch:
+        yield batch
+
+
+def _float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class DiscordNotifier:
+    """웹훅별 속도 제한을 지키는 묶음 전송기"""
+
+    def __init__(self, client, max_attempts=5, base_delay=1.0, max_delay=30.0):
+        self.client = client
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.delivered = 0
+        self.failed = 0
+        self.messages = 0
+        self.retries = 0
+        self._blocked_until = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    def _webhook_lock(self, webhook):
+        with self._lock:
+            return self._locks.setdefault(webhook, threading.Lock())
+
+    def _wait_for_bucket(self, webhook):
+        delay = self._blocked_until.get(webhook, 0.0) - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+    def _update_bucket(self, webhook, response):
+        """남은 요청이 없으면 리셋 시각까지 다음 전송을 미룸"""
+        remaining = _float(response.headers.get("X-RateLimit-Remaining"))
+        reset_after = _float(response.headers.get("X-RateLimit-Reset-After"))
+        if remaining is not None and remaining <= 0 and reset_after is not None:
+            self._blocked_until[webhook] = time.monotonic() + reset_after
+
+    def _retry_after(self, response):
+        """429 응답의 대기 시간 (본문 retry_after → Retry-After 헤더 순)"""
+        try:
+            delay = _float(response.json().get("retry_after"))
+        except ValueError:
+            delay = None
+        if delay is None:
+            delay = _float(response.headers.get("Retry-After"))
+        return delay if delay is not None else self.base_delay
+
+    def _backoff(self, attempt):
+        return min(self.max_delay, self.base_delay * (2 ** attempt)) * random.uniform(0.5, 1.0)
+
+    def _post(self, webhook, payload):
+        """메시지 하나 전송 → (성공 여부, 오류, 다시 보내면 성공할 수 있는지)"""
+        last_error = None
+        for attempt in range(self.max_attempts):
+            self._wait_for_bucket(webhook)
+            try:
+                response = self.client.post(webhook, json=payload)
+            except Exception as e:
+                last_error = str(e)
+                self.retries += 1
+                time.sleep(self._backoff(attempt))
+                continue
+
+            self._update_bucket(webhook, response)
+            if response.status_code < 300:
+                return True, None, True
+
+            last_error = f"HTTP {response.status_code}"
+            if response.status_code == 429:
+                delay = self._retry_after(response)
+                self._blocked_until[webhook] = time.monotonic() + delay
+            elif response.status_code >= 500:
+                time.sleep(self._backoff(attempt))
+            else:
+                # 잘못된 요청/권한 오류는 재시도해도 같음
+                return False, last_error, False
+            self.retries += 1
+        return False, last_error, True
+
+    def send(self, webhook, embeds, on_batch=None):
+        """임베드 목록을 묶어서 전송하고 (전송, 실패) 임베드 개수 반환
+
+        on_batch(start, end, ok, retryable)는 메시지 하나를 보낼 때마다 embeds[start:end] 범위와 결과로 호출됩니다.
+        retryable이 False면 웹훅이 요청 자체를 거부한 경우(4xx)라 다시 보내도 실패합니다.
+        """
+        delivered = failed = 0
+        start = 0
+        with self._webhook_lock(webhook):
+            for batch in pack_embeds(embeds):
+                ok, error, retryable = self._post(webhook, {"embeds": batch})
+                self.messages += 1
+                if on_batch is not None:
+                    on_batch(start, start + len(batch), ok, retryable)
+                start += len(batch)
+                if ok:
+                    delivered += len(batch)
+                else:
+                    failed += len(batch)
+                    print(f"Discord 전송 실패 ({len(batch)}개): {error}")
+
+        with self._lock:
+            self.delivered += delivered
+            self.failed += failed
+        return delivered, failed
+
+    def summary(self):
+        return f"전송 {self.delivered} / 실패 {self.failed} (메시지 {self.messages}, 재시도 {self.retries})"
+
+    def reset(self):
+        with self._lock:
+            self.delivered = 0
+            self.failed = 0
+            self.messages = 0
+            self.retries = 0
+
+
+class NotificationDispatcher:
+    """크기 제한이 있는 큐 + 전송 스레드
+
+    스크래퍼는 submit()으로 넣고 바로 다음 작업을 진행합니다.
+    큐가 가득 차면 put_timeout초까지 기다리고, 그래도 자리가 없으면 버린 개수로 집계합니다.
+    """
+
+    def __init__(self, notifier, maxsize=100, put_timeout=30):
+        self.notifier = notifier
+        self.queue = queue.Queue(maxsize)
+        self.put_timeout = put_timeout
+        self.dropped = 0
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="notifier", daemon=True)
+                self._thread.start()
+
+    def submit(self, webhook, embeds, label="", on_batch=None):
+        """전송할 임베드를 큐에 넣음 (on_batch는 DiscordNotifier.send() 참고)"""
+        self.start()
+        try:
+            self.queue.put((webhook, embeds, label, on_batch), timeout=self.put_timeout)
+        except queue.Full:
+            self.dropped += len(embeds)
+            print(f"{label} 알림 큐가 가득 차 {len(embeds)}개를 보내지 못했습니다.")
+            if on_batch is not None:
+                on_batch(0, len(embeds), False, True)
+
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            try:
+                if item is None:
+                    return
+                webhook, embeds, label, on_batch = item
+                delivered, failed = self.notifier.send(webhook, embeds, on_batch)
+                print(f"{label} 알림 전송 {delivered}개, 실패 {failed}개")
+            except Exception as e:
+                print(f"알림 전송 스레드 오류: {e}")
+            finally:
+                self.queue.task_done()
+
+    def pending(self):
+        """아직 전송이 끝나지 않은 묶음 수"""
+        return self.queue.unfinished_tasks
+
+    def drain(self, timeout):
+        """큐가 빌 때까지 최대 timeout초 대기 후 전송 스레드 종료, 남은 묶음 수 반환"""
+        deadline = time.monotonic() + timeout
+        with self.queue.all_tasks_done:
+            while self.queue.unfinished_tasks:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self.queue.all_tasks_done.wait(remaining)
+            left = self.queue.unfinished_tasks
+
+        if not left and self._thread is not None:
+            self.queue.put(None)
+            self._thread.join(timeout=1)
+        return left
@@ -0,0 +1,153 @@
+"""
+알림 아웃박스 (SQLite)
+감지한 알림을 (사이트, 상품 ID, 이벤트, 상태 버전) 키로 먼저 기록하고 전송이 끝나면 표시합니다.
+재시도된 실행에서 같은 알림을 다시 감지해도 이미 기록된 키는 건너뛰고,
+전송하지 못한 알림은 다음 실행에서 이어서 보내고, max_attempts번 실패했거나 웹훅이 거부한(4xx) 알림은 버립니다.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    site TEXT NOT NULL,
+    product_id TEXT NOT NULL,
+    event TEXT NOT NULL,
+    state_version TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    created REAL NOT NULL,
+    delivered REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (site, product_id, event, state_version)
+);
+CREATE INDEX IF NOT EXISTS outbox_delivered ON outbox (delivered);
+"""
+
+
+def state_version(record):
+    """상품 레코드의 상태 버전 (내용 해시)"""
+    if hasattr(record, "to_dict"):
+        record = record.to_dict()
+    data = json.dumps(record, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(data.encode("utf-8")).hexdigest()[:16]
+
+
+class Outbox:
+    """전송 대기/완료 알림 기록"""
+
+    def __init__(self, path, max_attempts=5):
+        self.path = path
+        self.max_attempts = max_attempts
+        self.dropped = 0
+        self.lock = threading.Lock()
+        self._conn = None
+        # 이 프로세스에서 전송 큐에 넣은 키 (중복 재전송 방지)
+        self._claimed = set()
+
+    @property
+    def conn(self):
+        """처음 사용할 때 DB 열기 (lock을 잡은 상태에서 호출)"""
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            # 캐시에는 .db 파일만 저장되므로 WAL 대신 기본 롤백 저널 (커밋하면 바로 .db에 반영, 예전 WAL 파일도 정리)
+            self._conn.execute("PRAGMA journal_mode=DELETE")
+            self._conn.executescript(_SCHEMA)
+        return self._conn
+
+    def add(self, site, product_id, event, record, payload):
+        """새 알림이면 기록하고 키 반환, 이미 기록된 알림이면 None"""
+        key = (site, str(product_id), event, state_version(record))
+        with self.lock, self.conn:
+            cursor = self.conn.execute(
+                "INSERT OR IGNORE INTO outbox (site, product_id, event, state_version, payload, created) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                key + (json.dumps(payload, ensure_ascii=False), time.time()),
+            )
+            if cursor.rowcount == 0:
+                return None
+            self._claimed.add(key)
+        return key
+
+    def claim_pending(self):
+        """아직 전송되지 않았고 큐에도 없는 알림 [(키, payload)] (오래된 순)"""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT site, product_id, event, state_version, payload FROM outbox "
+                "WHERE delivered IS NULL ORDER BY created"
+            ).fetchall()
+            pending = []
+            for row in rows:
+                key = tuple(row[:4])
+                if key not in self._claimed:
+                    self._claimed.add(key)
+                    pending.append((key, json.loads(row[4])))
+        return pending
+
+    def mark_delivered(self, keys):
+        now = time.time()
+        with self.lock, self.conn:
+            self.conn.executemany(
+                "UPDATE outbox SET delivered = ?, attempts = attempts + 1 "
+                "WHERE site = ? AND product_id = ? AND event = ? AND state_version = ?",
+                [(now,) + key for key in keys],
+            )
+            self._claimed.difference_update(keys)
+
+    def unclaim(self, keys):
+        """보내지 않고 표시만 해제 (웹훅 미설정 등 - 실패 횟수에 넣지 않음)"""
+        with self.lock:
+            self._claimed.difference_update(keys)
+
+    def release(self, keys, retryable=True):
+        """전송 실패 - 다음 claim_pending()에서 다시 가져가도록 표시 해제
+
+        재시도해도 안 되는 실패(retryable=False)이거나 max_attempts번 실패한 알림은 삭제하고 개수 반환
+        """
+        keys = list(keys)
+        with self.lock, self.conn:
+            self.conn.executemany(
+                "UPDATE outbox SET attempts = attempts + 1 "
+                "WHERE site = ? AND product_id = ? AND event = ? AND state_version = ?",
+                keys,
+            )
+            dead = []
+            for key in keys:
+                row = self.conn.execute(
+                    "SELECT attempts, payload FROM outbox "
+                    "WHERE site = ? AND product_id = ? AND event = ? AND state_version = ?",
+                    key,
+                ).fetchone()
+                if row is not None and (not retryable or row[0] >= self.max_attempts):
+                    dead.append((key, row[0], json.loads(row[1])))
+            self.conn.executemany(
+                "DELETE FROM outbox WHERE site = ? AND product_id = ? AND event = ? AND state_version = ?",
+                [key for key, _, _ in dead],
+            )
+            self._claimed.difference_update(keys)
+
+        for (site, product_id, event, _), attempts, payload in dead:
+            reason = "웹훅이 거부" if not retryable else f"{attempts}회 실패"
+            print(f"[{site}] {event} 알림 전송 포기 ({reason}): {product_id} {str(payload.get('description', ''))[:50]}")
+        self.dropped += len(dead)
+        return len(dead)
+
+    def purge_delivered(self):
+        """상품 목록이 저장된 뒤 호출 - 전송 완료된 기록 삭제"""
+        with self.lock, self.conn:
+            return self.conn.execute("DELETE FROM outbox WHERE delivered IS NOT NULL").rowcount
+
+    def counts(self):
+        with self.lock:
+            pending, delivered = self.conn.execute(
+                "SELECT COUNT(*) - COUNT(delivered), COUNT(delivered) FROM outbox"
+            ).fetchone()
+        return {"pending": pending, "delivered": delivered}
+
+    def close(self):
+        with self.lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
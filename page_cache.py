@@ -0,0 +1,125 @@
+"""
+목록 페이지 지문 캐시
+URL/뷰별로 ETag, Last-Modified, 상품 목록 영역 해시, 상품 ID 목록을 기억해 두고
+페이지가 그대로면 파싱을 건너뜁니다. 상품 정보는 저장된 상품 목록에서 다시 꺼내 쓰고,
+사이트의 모든 뷰가 그대로면 저장된 상품과의 비교(diff_site)도 건너뜁니다.
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def fingerprint(html, scope=None):
+    """상품 목록 영역(첫 상품 ~ 마지막 상품, 뒤쪽 영역 제외)을 공백 정규화한 뒤 해시"""
+    region = scope.items(html) if scope is not None else None
+    if region is None:
+        region = html
+    return hashlib.sha1(_WHITESPACE.sub(" ", region).encode("utf-8")).hexdigest()
+
+
+class PageCache:
+    """뷰별 지문 캐시 (JSON 파일로 저장)"""
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+        # 이번 사이클에 처리한 뷰가 하나라도 바뀐 사이트 {사이트: 바뀜 여부}
+        self._sites = {}
+        self.lock = threading.Lock()
+        if path and os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    self.entries = json.load(f)
+            except (OSError, ValueError):
+                self.entries = {}
+
+    def _usable(self, key, site_saved):
+        """캐시된 상품이 모두 저장 목록에 있어야 재사용 가능"""
+        entry = self.entries.get(key)
+        if not entry:
+            return None
+        if any(pid not in site_saved for pid in entry["ids"]):
+            return None
+        return entry
+
+    def request_headers(self, key, site_saved):
+        """조건부 요청 헤더 (If-None-Match / If-Modified-Since)"""
+        entry = self._usable(key, site_saved)
+        headers = {}
+        if entry:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def lookup(self, key, response, site_saved, scope=None):
+        """응답이 이전과 같으면 저장된 상품 dict, 바뀌었으면 None
+
+        바뀐 경우 계산한 지문은 update()에서 쓰도록 보관합니다.
+        """
+        entry = self._usable(key, site_saved)
+        digest = None
+        if response.status_code != 304:
+            digest = fingerprint(response.text, scope)
+
+        with self.lock:
+            if entry and (response.status_code == 304 or entry.get("digest") == digest):
+                self.hits += 1
+                return {pid: site_saved[pid] for pid in entry["ids"]}
+            self.misses += 1
+            self.entries.setdefault(key, {})["pending_digest"] = digest
+        return None
+
+    def ids(self, key):
+        """마지막으로 저장한 뷰의 상품 ID 목록 (페이지 순서, 없으면 빈 목록)"""
+        with self.lock:
+            return list(self.entries.get(key, {}).get("ids", []))
+
+    def update(self, key, response, page_products):
+        """파싱이 끝난 뷰의 지문과 상품 ID 저장"""
+        with self.lock:
+            entry = self.entries.setdefault(key, {})
+            entry.update(
+                etag=response.headers.get("ETag"),
+                last_modified=response.headers.get("Last-Modified"),
+                digest=entry.pop("pending_digest", None),
+                ids=list(page_products.keys()),
+            )
+
+    def mark(self, site, changed):
+        """이번 사이클에 처리한 뷰의 변경 여부 기록"""
+        with self.lock:
+            self._sites[site] = self._sites.get(site, False) or changed
+
+    def unchanged(self, site):
+        """이번 사이클에 처리한 사이트의 뷰가 모두 이전과 같은 페이지였는지 (기록이 없으면 False)"""
+        with self.lock:
+            return self._sites.get(site) is False
+
+    def summary(self):
+        return f"적중 {self.hits} / 미적중 {self.misses}"
+
+    def reset_counts(self):
+        self.hits = 0
+        self.misses = 0
+        self._sites = {}
+
+    def save(self):
+        """임시 파일에 쓴 뒤 교체"""
+        if not self.path:
+            return
+        with self.lock:
+            data = {key: {k: v for k, v in entry.items() if k != "pending_digest"}
+                    for key, entry in self.entries.items() if "ids" in entry}
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,445 @@
+"""
+HTML 파서 백엔드
+selectolax / lxml / BeautifulSoup 위에 같은 노드 인터페이스를 제공합니다.
+백엔드는 LP_PARSER 환경변수(auto, selectolax, lxml, bs4)로 고를 수 있고,
+auto이면 설치된 것 중 lxml → selectolax → bs4 순으로 사용합니다.
+
+selectolax가 가장 빠르지만 HTML5 규칙대로 트리를 만들기 때문에(<tbody> 자동 삽입 등)
+부모를 거슬러 올라가는 파싱은 html.parser와 결과가 달라질 수 있습니다.
+바꾸기 전에 compare_backends로 저장된 페이지 결과를 확인하세요.
+"""
+
+import os
+import re
+import time
+from functools import lru_cache
+
+# 텍스트 추출 시 제외할 태그 (BeautifulSoup get_text와 동일하게)
+_SKIP_TEXT_TAGS = {"script", "style", "template"}
+
+
+class BS4Node:
+    """BeautifulSoup 요소 래퍼"""
+
+    __slots__ = ("el",)
+
+    def __init__(self, el):
+        self.el = el
+
+    def select(self, css):
+        return [BS4Node(e) for e in self.el.select(css)]
+
+    def select_one(self, css):
+        e = self.el.select_one(css)
+        return BS4Node(e) if e is not None else None
+
+    def get(self, name, default=None):
+        value = self.el.get(name, default)
+        if isinstance(value, list):
+            return " ".join(value)
+        return value
+
+    @property
+    def attrs(self):
+        return {k: " ".join(v) if isinstance(v, list) else v for k, v in self.el.attrs.items()}
+
+    @property
+    def parent(self):
+        p = self.el.parent
+        return BS4Node(p) if p is not None and p.name != "[document]" else None
+
+    def text(self, strip=False):
+        return self.el.get_text(strip=strip)
+
+    def strings(self):
+        """script/style 내용과 주석까지 포함한 모든 하위 문자열 (markup 규칙용)"""
+        return [str(d) for d in self.el.descendants if isinstance(d, str)]
+
+    def html(self):
+        return str(self.el)
+
+    def iter_elements(self):
+        """(태그, 속성) 순회 - 자기 자신이 맨 처음"""
+        yield self.el.name, self.attrs
+        for d in self.el.descendants:
+            if getattr(d, "attrs", None) is not None and d.name:
+                yield d.name, {k: " ".join(v) if isinstance(v, list) else v for k, v in d.attrs.items()}
+
+
+class LxmlNode:
+    """lxml 요소 래퍼"""
+
+    __slots__ = ("el",)
+
+    def __init__(self, el):
+        self.el = el
+
+    def select(self, css):
+        # cssselect는 자기 자신도 매칭하므로 BeautifulSoup처럼 하위 요소만 남김
+        return [LxmlNode(e) for e in _lxml_selector(css)(self.el) if e is not self.el]
+
+    def select_one(self, css):
+        for e in _lxml_selector(css)(self.el):
+            if e is not self.el:
+                return LxmlNode(e)
+        return None
+
+    def get(self, name, default=None):
+        return self.el.get(name, default)
+
+    @property
+    def attrs(self):
+        return dict(self.el.attrib)
+
+    @property
+    def parent(self):
+        p = self.el.getparent()
+        return LxmlNode(p) if p is not None else None
+
+    def text(self, strip=False):
+        parts = []
+
+        def walk(el):
+            if isinstance(el.tag, str) and el.tag in _SKIP_TEXT_TAGS:
+                return
+            if isinstance(el.tag, str) and el.text:
+                parts.append(el.text)
+            for child in el:
+                walk(child)
+                if child.tail:
+                    parts.append(child.tail)
+
+        walk(self.el)
+        if strip:
+            return "".join(p.strip() for p in parts)
+        return "".join(parts)
+
+    def strings(self):
+        """script/style 내용과 주석까지 포함한 모든 하위 문자열 (markup 규칙용)"""
+        parts = []
+        for e in self.el.iter():
+            if e.text:
+                parts.append(e.text)
+            if e is not self.el and e.tail:
+                parts.append(e.tail)
+        return parts
+
+    def html(self):
+        from lxml import etree
+
+        return etree.tostring(self.el, encoding=str, method="html", with_tail=False)
+
+    def iter_elements(self):
+        """(태그, 속성) 순회 - 자기 자신이 맨 처음"""
+        for e in self.el.iter():
+            if isinstance(e.tag, str):
+                yield e.tag, e.attrib
+
+
+class SelectolaxNode:
+    """selectolax 노드 래퍼"""
+
+    __slots__ = ("el",)
+
+    def __init__(self, el):
+        self.el = el
+
+    def select(self, css):
+        own = self.el.mem_id
+        return [SelectolaxNode(e) for e in self.el.css(css) if e.mem_id != own]
+
+    def select_one(self, css):
+        own = self.el.mem_id
+        for e in self.el.css(css):
+            if e.mem_id != own:
+                return SelectolaxNode(e)
+        return None
+
+    def get(self, name, default=None):
+        value = self.el.attributes.get(name, default)
+        # 값 없는 속성(<input disabled>)은 None으로 들어옴
+        return "" if value is None and name in self.el.attributes else value
+
+    @property
+    def attrs(self):
+        return {k: v or "" for k, v in self.el.attributes.items()}
+
+    @property
+    def parent(self):
+        p = self.el.parent
+        return SelectolaxNode(p) if p is not None and p.tag != "-undef" else None
+
+    def text(self, strip=False):
+        parts = []
+        for node in self.el.traverse(include_text=True):
+            if node.tag == "-text":
+                parent = node.parent
+                if parent is not None and parent.tag in _SKIP_TEXT_TAGS:
+                    continue
+                parts.append(node.text_content or "")
+        if strip:
+            return "".join(p.strip() for p in parts)
+        return "".join(parts)
+
+    def strings(self):
+        """script/style 내용과 주석까지 포함한 모든 하위 문자열 (markup 규칙용)"""
+        parts = []
+        for node in self.el.traverse(include_text=True):
+            if node.tag == "-text":
+                parts.append(node.text_content or "")
+            elif node.tag in ("-comment", "_comment"):
+                parts.append(node.html or "")
+        return parts
+
+    def html(self):
+        return self.el.html
+
+    def iter_elements(self):
+        """(태그, 속성) 순회 - 자기 자신이 맨 처음"""
+        yield self.el.tag, self.attrs
+        own = self.el.mem_id
+        for node in self.el.traverse():
+            if node.mem_id != own:
+                yield node.tag, node.attributes
+
+
+class SoldoutClassifier:
+    """선언형 규칙으로 만든 사이트별 품절 판별기
+
+    규칙은 (종류, 문자열) 목록이며 앞에 있을수록 우선합니다.
+      text    - 항목 텍스트에 포함
+      markup  - script/style/주석을 포함한 문자열, 태그/속성 이름·값 어디든 포함 (대소문자 무시, str(item).lower() 검사 대체)
+      class   - 하위 요소의 class 값에 포함
+      img_alt - 하위 img의 alt에 포함
+      img_src - 하위 img의 src에 포함
+    요소는 한 번만 순회하고, 품절로 판정된 경우에만 어떤 규칙이 걸렸는지 찾습니다.
+    """
+
+    KINDS = ("text", "markup", "class", "img_alt", "img_src")
+
+    def __init__(self, rules):
+        for kind, _ in rules:
+            if kind not in self.KINDS:
+                raise ValueError(f"알 수 없는 품절 규칙 종류: {kind}")
+        self.rules = [(kind, needle.lower()) for kind, needle in rules]
+        self._patterns = {}
+        for kind in self.KINDS:
+            needles = [needle for k, needle in self.rules if k == kind]
+            if needles:
+                self._patterns[kind] = re.compile("|".join(re.escape(n) for n in needles))
+        self._needs_elements = any(kind != "text" for kind in self._patterns)
+        self.hits = {}
+        self.reasons = {}
+
+    def classify(self, node, product_id=None, text=None):
+        """품절이면 걸린 규칙 이름("종류:문자열"), 아니면 None"""
+        text = (node.text() if text is None else text).lower()
+        haystacks = {"text": text}
+
+        if self._needs_elements:
+            # markup은 예전 str(item) 검사처럼 화면에 안 보이는 script/주석 속 문자열도 포함
+            markup, classes, alts, srcs = [s.lower() for s in node.strings()], [], [], []
+            for index, (tag, attrs) in enumerate(node.iter_elements()):
+                markup.append(tag)
+                for name, value in attrs.items():
+                    markup.append(name)
+                    markup.append((value or "").lower())
+                # class/img 규칙은 select_one처럼 하위 요소만 검사
+                if index == 0:
+                    continue
+                classes.append((attrs.get("class") or "").lower())
+                if tag == "img":
+                    alts.append((attrs.get("alt") or "").lower())
+                    srcs.append((attrs.get("src") or "").lower())
+            haystacks.update(
+                markup="\n".join(markup),
+                **{"class": "\n".join(classes)},
+                img_alt="\n".join(alts),
+                img_src="\n".join(srcs),
+            )
+
+        if not any(pattern.search(haystacks[kind]) for kind, pattern in self._patterns.items()):
+            return None
+
+        for kind, needle in self.rules:
+            if needle in haystacks[kind]:
+                reason = f"{kind}:{needle}"
+                self.hits[reason] = self.hits.get(reason, 0) + 1
+                if product_id is not None:
+                    self.reasons[product_id] = reason
+                return reason
+        return None
+
+    def summary(self):
+        """규칙별 적중 횟수 문자열 (적중이 없으면 빈 문자열)"""
+        return ", ".join(f"{reason}={count}" for reason, count in sorted(self.hits.items()))
+
+    def reset(self):
+        self.hits = {}
+        self.reasons = {}
+
+
+class ParseScope:
+    """사이트가 관심 있는 상품 목록 영역 선언
+
+    start: 상품 요소 시작 태그 정규식. 처음 나온 곳부터 마지막으로 나온 곳 + tail 글자까지만 잘라 파싱합니다.
+    (페이지 지문용 items()는 tail 대신 마지막 상품 요소가 닫히는 곳까지만 자릅니다.)
+    tag/attrs: BeautifulSoup SoupStrainer 조건 (bs4 백엔드는 이 요소들만 트리로 만듦)
+    start가 페이지에 없으면 전체 문서를 그대로 파싱합니다.
+    """
+
+    def __init__(self, tag, attrs, start, tail=20000):
+        self.tag = tag
+        self.attrs = attrs
+        self.start = re.compile(start, re.IGNORECASE)
+        self.tail = tail
+        self._tags = re.compile(rf"<(/?){re.escape(tag)}\b[^>]*>", re.IGNORECASE)
+
+    def _bounds(self, html):
+        """상품 요소가 처음/마지막으로 시작하는 위치 (없으면 None, None)"""
+        first = last = None
+        for match in self.start.finditer(html):
+            if first is None:
+                first = match.start()
+            last = match.start()
+        return first, last
+
+    def slice(self, html):
+        """상품 목록 영역만 잘라서 반환 (찾지 못하면 None)"""
+        first, last = self._bounds(html)
+        if first is None:
+            return None
+        return html[first:last + self.tail]
+
+    def items(self, html):
+        """첫 상품 요소부터 마지막 상품 요소의 닫는 태그까지 (뒤쪽 광고/추천 영역 제외, 찾지 못하면 None)"""
+        first, last = self._bounds(html)
+        if first is None:
+            return None
+        depth = 0
+        for match in self._tags.finditer(html, last):
+            depth += -1 if match.group(1) else 1
+            if depth == 0:
+                return html[first:match.end()]
+        # 닫는 태그를 생략한 페이지는 slice()와 같은 범위
+        return html[first:last + self.tail]
+
+    def strainer(self):
+        from bs4 import SoupStrainer
+
+        return SoupStrainer(self.tag, attrs=self.attrs)
+
+
+@lru_cache(maxsize=None)
+def _lxml_selector(css):
+    from lxml.cssselect import CSSSelector
+
+    return CSSSelector(css)
+
+
+def _parse_bs4(html, strainer=None):
+    from bs4 import BeautifulSoup
+
+    return BS4Node(BeautifulSoup(html, "html.parser", parse_only=strainer))
+
+
+def _parse_lxml(html):
+    import lxml.html
+
+    return LxmlNode(lxml.html.document_fromstring(html))
+
+
+def _selectolax_parser():
+    # 1.0부터는 lexbor 백엔드만 지원 (이전 버전은 modest 파서)
+    try:
+        from selectolax.lexbor import LexborHTMLParser
+
+        return LexborHTMLParser
+    except ImportError:
+        from selectolax.parser import HTMLParser
+
+        return HTMLParser
+
+
+def _parse_selectolax(html):
+    return SelectolaxNode(_selectolax_parser()(html).root)
+
+
+BACKENDS = {
+    "selectolax": _parse_selectolax,
+    "lxml": _parse_lxml,
+    "bs4": _parse_bs4,
+}
+
+# auto 선택 시 우선순위 (html.parser와 트리 구조가 같은 lxml 우선)
+_PREFERENCE = ["lxml", "selectolax", "bs4"]
+_LOADERS = {
+    "selectolax": _selectolax_parser,
+    "lxml": lambda: _lxml_selector("a"),
+    "bs4": lambda: __import__("bs4"),
+}
+
+
+@lru_cache(maxsize=None)
+def is_available(name):
+    """백엔드에 필요한 모듈이 설치되어 있는지 확인"""
+    try:
+        _LOADERS[name]()
+        return True
+    except ImportError:
+        return False
+
+
+def available_backends():
+    return [name for name in _PREFERENCE if is_available(name)]
+
+
+def resolve_backend(name=None):
+    """백엔드 이름 결정 (지정한 백엔드가 없으면 BeautifulSoup으로 대체)"""
+    name = (name or os.environ.get("LP_PARSER", "auto")).lower()
+    if name == "auto":
+        backends = available_backends()
+        return backends[0] if backends else "bs4"
+    if name not in BACKENDS:
+        raise ValueError(f"알 수 없는 파서 백엔드: {name}")
+    return name if is_available(name) else "bs4"
+
+
+def parse_html(html, backend=None, scope=None):
+    """HTML을 파싱해 루트 노드 반환 (scope가 있으면 상품 목록 영역만 파싱)"""
+    name = resolve_backend(backend)
+    if scope is not None:
+        region = scope.slice(html)
+        if region is not None:
+            if name == "bs4":
+                return _parse_bs4(region, scope.strainer())
+            return BACKENDS[name](region)
+    return BACKENDS[name](html)
+
+
+def compare_backends(parse_func, html, backends=None, baseline=None):
+    """같은 HTML을 백엔드별로 파싱해 결과와 소요 시간 비교
+
+    parse_func(html, backend=...)는 상품 dict를 반환해야 합니다.
+    baseline이 없으면 bs4 결과를 기준으로 비교합니다.
+    반환값: {백엔드: {"seconds": float, "count": int, "diff": [다른 상품 ID...]}}
+    """
+    backends = backends or available_backends()
+    report = {}
+
+    for name in ["bs4"] + [b for b in backends if b != "bs4"]:
+        if not is_available(name):
+            continue
+        started = time.perf_counter()
+        result = parse_func(html, backend=name)
+        seconds = time.perf_counter() - started
+
+        if baseline is None:
+            baseline = result
+        diff = sorted(
+            pid for pid in set(baseline) | set(result)
+            if baseline.get(pid) != result.get(pid)
+        )
+        report[name] = {"seconds": seconds, "count": len(result), "diff": diff}
+
+    return report
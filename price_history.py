@@ -0,0 +1,195 @@
+"""
+가격 이력 (SQLite)
+상품마다 (시각, 원 단위 가격) 이력을 8바이트 고정 크기로 묶어 청크 단위로 이어 붙여 저장합니다.
+가격이 바뀔 때만 기록하고, 최신 가격/최저가/최고가는 별도 테이블 한 행에 보관하므로
+기록과 "현재가 vs 최저가" 조회는 상품당 한 행만 읽습니다. 가득 찬 청크는 다시 쓰지 않습니다.
+상품 저장소(products.db)와는 별도 파일이라 상품 목록 크기에 영향을 주지 않습니다.
+"""
+
+import sqlite3
+import struct
+import threading
+import time
+from collections import namedtuple
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS price_latest (
+    site TEXT NOT NULL,
+    product_id TEXT NOT NULL,
+    price INTEGER NOT NULL,
+    updated INTEGER NOT NULL,
+    lowest INTEGER NOT NULL,
+    lowest_at INTEGER NOT NULL,
+    highest INTEGER NOT NULL,
+    chunk INTEGER NOT NULL,
+    points INTEGER NOT NULL,
+    PRIMARY KEY (site, product_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS price_chunks (
+    site TEXT NOT NULL,
+    product_id TEXT NOT NULL,
+    chunk INTEGER NOT NULL,
+    data BLOB NOT NULL,
+    PRIMARY KEY (site, product_id, chunk)
+) WITHOUT ROWID;
+"""
+
+# (유닉스 시각 초, 가격) - 부호 없는 32비트 두 개
+_POINT = struct.Struct("<II")
+CHUNK_POINTS = 32
+
+# lowest/highest/lowest_at은 이번 가격을 기록하기 전 값
+PriceChange = namedtuple("PriceChange", ["previous", "price", "lowest", "lowest_at", "highest"])
+PriceSummary = namedtuple("PriceSummary", ["price", "updated", "lowest", "lowest_at", "highest", "points"])
+
+
+class DropRule:
+    """가격 인하 알림 기준 (인하율 % 이상 그리고 인하액 이상, lowest_only면 최저가 경신일 때만)"""
+
+    def __init__(self, min_percent=5.0, min_amount=0, lowest_only=False):
+        self.min_percent = min_percent
+        self.min_amount = min_amount
+        self.lowest_only = lowest_only
+
+    def check(self, change):
+        if change.previous is None or change.price >= change.previous:
+            return False
+        drop = change.previous - change.price
+        if drop < self.min_amount or drop * 100 < self.min_percent * change.previous:
+            return False
+        if self.lowest_only and change.lowest is not None and change.price >= change.lowest:
+            return False
+        return True
+
+    def __str__(self):
+        rule = f"{self.min_percent:g}% 이상"
+        if self.min_amount:
+            rule += f", {self.min_amount:,}원 이상"
+        if self.lowest_only:
+            rule += ", 최저가 경신"
+        return rule
+
+
+class PriceHistory:
+    """상품별 가격 이력 기록/조회"""
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self._conn = None
+        self.recorded = 0
+
+    @property
+    def conn(self):
+        """처음 사용할 때 DB 열기 (lock을 잡은 상태에서 호출)"""
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            # 캐시에는 .db 파일만 저장되므로 WAL 대신 기본 롤백 저널 (커밋하면 바로 .db에 반영, 예전 WAL 파일도 정리)
+            self._conn.execute("PRAGMA journal_mode=DELETE")
+            self._conn.executescript(_SCHEMA)
+        return self._conn
+
+    def _append(self, site, product_id, latest, price, timestamp):
+        """이력에 한 점 추가 후 새 최신 행 반환 (latest: 기존 최신 행 또는 None)"""
+        point = _POINT.pack(timestamp, price)
+        if latest is None:
+            chunk, points = 0, 0
+            lowest, lowest_at, highest = price, timestamp, price
+        else:
+            _, _, lowest, lowest_at, highest, chunk, points = latest
+            if price < lowest:
+                lowest, lowest_at = price, timestamp
+            highest = max(highest, price)
+
+        if points and points % CHUNK_POINTS == 0:
+            chunk += 1
+        if points % CHUNK_POINTS == 0:
+            self.conn.execute(
+                "INSERT INTO price_chunks (site, product_id, chunk, data) VALUES (?, ?, ?, ?)",
+                (site, product_id, chunk, point),
+            )
+        else:
+            # 열린 청크(최대 CHUNK_POINTS개)만 다시 씀
+            (data,) = self.conn.execute(
+                "SELECT data FROM price_chunks WHERE site = ? AND product_id = ? AND chunk = ?",
+                (site, product_id, chunk),
+            ).fetchone()
+            self.conn.execute(
+                "UPDATE price_chunks SET data = ? WHERE site = ? AND product_id = ? AND chunk = ?",
+                (bytes(data) + point, site, product_id, chunk),
+            )
+
+        row = (price, timestamp, lowest, lowest_at, highest, chunk, points + 1)
+        self.conn.execute(
+            "INSERT OR REPLACE INTO price_latest "
+            "(site, product_id, price, updated, lowest, lowest_at, highest, chunk, points) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (site, product_id) + row,
+        )
+        self.recorded += 1
+        return row
+
+    def record(self, site, product_id, price, previous=None, timestamp=None):
+        """가격 기록 → PriceChange (가격이 그대로거나 없으면 None)
+
+        이력이 없는 상품은 previous(저장돼 있던 가격)를 먼저 기록해 첫 인하도 감지합니다.
+        commit()을 호출해야 저장됩니다.
+        """
+        if price is None:
+            return None
+        product_id = str(product_id)
+        timestamp = int(timestamp if timestamp is not None else time.time())
+        with self.lock:
+            latest = self.conn.execute(
+                "SELECT price, updated, lowest, lowest_at, highest, chunk, points "
+                "FROM price_latest WHERE site = ? AND product_id = ?",
+                (site, product_id),
+            ).fetchone()
+            if latest is None and previous is not None and previous != price:
+                latest = self._append(site, product_id, None, previous, timestamp)
+            if latest is not None and latest[0] == price:
+                return None
+
+            change = PriceChange(
+                latest[0] if latest else None, price,
+                latest[2] if latest else None, latest[3] if latest else None, latest[4] if latest else None,
+            )
+            self._append(site, product_id, latest, price, timestamp)
+            return change
+
+    def lowest(self, site, product_id):
+        """현재가/최저가/최고가 요약 (이력이 없으면 None)"""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT price, updated, lowest, lowest_at, highest, points "
+                "FROM price_latest WHERE site = ? AND product_id = ?",
+                (site, str(product_id)),
+            ).fetchone()
+        return PriceSummary(*row) if row else None
+
+    def history(self, site, product_id):
+        """전체 이력 [(유닉스 시각, 가격), ...] (오래된 순)"""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT data FROM price_chunks WHERE site = ? AND product_id = ? ORDER BY chunk",
+                (site, str(product_id)),
+            ).fetchall()
+        return [point for (data,) in rows for point in _POINT.iter_unpack(data)]
+
+    def commit(self):
+        with self.lock:
+            if self._conn is not None:
+                self._conn.commit()
+
+    def summary(self):
+        return f"가격 기록 {self.recorded}건"
+
+    def reset(self):
+        self.recorded = 0
+
+    def close(self):
+        with self.lock:
+            if self._conn is not None:
+                self._conn.commit()
+                self._conn.close()
+                self._conn = None
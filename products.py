@@ -0,0 +1,174 @@
+"""
+상품 레코드
+가격은 원 단위 정수, 사이트는 enum, URL/이미지 주소는 공통 앞부분을 한 번만 보관하는 __slots__ 레코드입니다.
+표시용 가격 문자열("49,000원")은 알림을 만들 때만 만듭니다.
+저장 파일/DB에는 to_dict() 형식(가격은 예전과 같은 "49,000원" 문자열)으로 쓰고, from_dict()에서 정수로 바꿔 읽습니다.
+"""
+
+import re
+import sys
+from enum import IntEnum
+
+
+class Site(IntEnum):
+    YES24 = 1
+    ALADIN = 2
+    KTOWN4U = 3
+
+    @property
+    def key(self):
+        """SITES 설정의 키 ("yes24" 등)"""
+        return self.name.lower()
+
+    @classmethod
+    def from_key(cls, key):
+        return key if isinstance(key, cls) else cls[key.upper()]
+
+
+# 자주 나오는 주소 앞부분 (긴 것부터 비교) - 목록에 없으면 scheme://host/ 단위로 등록
+_KNOWN_PREFIXES = [
+    "https://www.yes24.com/Product/Goods/",
+    "https://image.yes24.com/goods/",
+    "https://www.aladin.co.kr/shop/wproduct.aspx?ItemId=",
+    "https://image.aladin.co.kr/product/",
+    "https://kr.ktown4u.com/iteminfo?goods_no=",
+]
+_prefixes = [""]
+_prefix_index = {"": 0}
+_ORIGIN = re.compile(r"^[a-z]+://[^/]+/")
+# 첫 번째 숫자만 ("49,000원 (정가 55,000원)" → 49000, "KRW 12,300.00" → 12300)
+_NUMBER = re.compile(r"\d[\d,]*")
+
+
+def _register(prefix):
+    if prefix not in _prefix_index:
+        _prefix_index[prefix] = len(_prefixes)
+        _prefixes.append(sys.intern(prefix))
+    return _prefix_index[prefix]
+
+
+for _prefix in _KNOWN_PREFIXES:
+    _register(_prefix)
+
+
+def split_address(address):
+    """주소 → (앞부분 번호, 나머지)"""
+    if not address:
+        return 0, ""
+    for prefix in _KNOWN_PREFIXES:
+        if address.startswith(prefix):
+            return _prefix_index[prefix], address[len(prefix):]
+    match = _ORIGIN.match(address)
+    if match:
+        return _register(match.group(0)), address[match.end():]
+    return 0, address
+
+
+def parse_price(value):
+    """가격 표시 문자열/숫자 → 원 단위 정수 (없으면 None)"""
+    if value is None or value == "":
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    match = _NUMBER.search(str(value))
+    return int(match.group(0).replace(",", "")) if match else None
+
+
+def format_price(price):
+    """원 단위 정수 → "49,000원" (없으면 빈 문자열)"""
+    return f"{price:,}원" if price is not None else ""
+
+
+class Product:
+    """상품 한 개 (상품 ID는 상위 dict의 키)"""
+
+    __slots__ = (
+        "site", "title", "price", "soldout",
+        "_url_prefix", "_url_rest", "_image_prefix", "_image_rest",
+        "first_seen", "last_seen",
+    )
+
+    def __init__(self, site, title, url, price=None, image="", soldout=False, first_seen=None, last_seen=None):
+        self.site = Site.from_key(site)
+        self.title = title
+        self.price = price
+        self.soldout = bool(soldout)
+        self._url_prefix, self._url_rest = split_address(url)
+        self._image_prefix, self._image_rest = split_address(image)
+        # 날짜 문자열은 대부분 같은 값이라 공유
+        self.first_seen = sys.intern(first_seen) if first_seen else None
+        self.last_seen = sys.intern(last_seen) if last_seen else None
+
+    @property
+    def url(self):
+        return _prefixes[self._url_prefix] + self._url_rest
+
+    @property
+    def image(self):
+        return _prefixes[self._image_prefix] + self._image_rest
+
+    @property
+    def price_display(self):
+        return format_price(self.price)
+
+    def _key(self):
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __eq__(self, other):
+        if not isinstance(other, Product):
+            return NotImplemented
+        return self._key() == other._key()
+
+    def __repr__(self):
+        return f"Product({self.site.key}, {self.title!r}, price={self.price}, soldout={self.soldout})"
+
+    def replace(self, **changes):
+        """일부 필드만 바꾼 새 레코드"""
+        data = self.to_dict()
+        data.update(changes)
+        return Product.from_dict(self.site, data)
+
+    def to_dict(self):
+        """저장용 dict (가격은 예전 형식 그대로 "49,000원", 없으면 빈 문자열)"""
+        data = {
+            "title": self.title,
+            "price": format_price(self.price),
+            "url": self.url,
+            "image": self.image,
+            "soldout": self.soldout,
+        }
+        if self.first_seen:
+            data["first_seen"] = self.first_seen
+        if self.last_seen:
+            data["last_seen"] = self.last_seen
+        return data
+
+    @classmethod
+    def from_dict(cls, site, data):
+        """저장된 레코드 → Product ("49,000원" 형식 가격은 정수로 변환)"""
+        return cls(
+            site,
+            data.get("title", ""),
+            data.get("url", ""),
+            parse_price(data.get("price")),
+            data.get("image", ""),
+            data.get("soldout", False),
+            data.get("first_seen"),
+            data.get("last_seen"),
+        )
+
+
+def to_products(data):
+    """{사이트: {상품 ID: dict}} → {사이트: {상품 ID: Product}}"""
+    return {
+        site: {pid: Product.from_dict(site, record) for pid, record in products.items()}
+        for site, products in data.items()
+    }
+
+
+def to_dicts(data):
+    """{사이트: {상품 ID: Product}} → 저장용 dict"""
+    return {
+        site: {pid: record.to_dict() for pid, record in products.items()}
+        for site, products in data.items()
+    }
@@ -0,0 +1,120 @@
+"""
+호스트별 토큰 버킷 요청 속도 제한
+429 / Retry-After를 받으면 속도를 절반으로 줄이고 지정된 시간만큼 멈추며,
+정상 응답이 이어지면 설정한 속도까지 조금씩 다시 올립니다.
+"""
+
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+
+def parse_retry_after(value):
+    """Retry-After 헤더(초 또는 HTTP 날짜)를 초 단위로 변환"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+        return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """초당 rate개씩 채워지고 최대 burst개까지 쌓이는 토큰 버킷"""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self):
+        """토큰 하나를 예약하고 기다려야 할 시간(초) 반환"""
+        with self.lock:
+            now = time.monotonic()
+            self._refill(now)
+            wait = max(0.0, self.paused_until - now)
+            self.tokens -= 1
+            if self.tokens < 0:
+                wait = max(wait, -self.tokens / self.rate)
+            return wait
+
+    def acquire(self):
+        """토큰이 생길 때까지 대기 (기다리는 동안 일시정지가 걸리면 그만큼 더 대기)"""
+        waited = 0.0
+        wait = self.reserve()
+        while wait > 0:
+            time.sleep(wait)
+            waited += wait
+            with self.lock:
+                wait = max(0.0, self.paused_until - time.monotonic())
+        return waited
+
+
+class AdaptiveRateLimiter:
+    """호스트별 토큰 버킷 + 응답 상태에 따른 속도 조절"""
+
+    def __init__(self, limits=None, default=(2.0, 2), min_rate=0.1, recover_step=0.1):
+        self.limits = dict(limits or {})
+        self.default = default
+        self.min_rate = min_rate
+        self.recover_step = recover_step
+        self.buckets = {}
+        self.stats = {}
+        self.lock = threading.Lock()
+
+    def bucket(self, host):
+        with self.lock:
+            if host not in self.buckets:
+                rate, burst = self.limits.get(host, self.default)
+                self.buckets[host] = TokenBucket(rate, burst)
+                self.stats[host] = {"requests": 0, "throttled": 0, "waited": 0.0}
+            return self.buckets[host]
+
+    def acquire(self, url):
+        """요청 전에 호출 - 토큰이 생길 때까지 대기"""
+        host = urlsplit(url).hostname or url
+        waited = self.bucket(host).acquire()
+        with self.lock:
+            self.stats[host]["requests"] += 1
+            self.stats[host]["waited"] += waited
+        return waited
+
+    def on_response(self, url, status_code, retry_after=None):
+        """응답 후 호출 - 429/503이면 감속 후 일시정지, 정상이면 서서히 복구"""
+        host = urlsplit(url).hostname or url
+        bucket = self.bucket(host)
+        max_rate = self.limits.get(host, self.default)[0]
+
+        with bucket.lock:
+            if status_code in (429, 503):
+                bucket.rate = max(self.min_rate, bucket.rate / 2)
+                delay = parse_retry_after(retry_after)
+                if delay is None:
+                    delay = 1 / bucket.rate
+                bucket.paused_until = max(bucket.paused_until, time.monotonic() + delay)
+                bucket.tokens = 0.0
+                bucket.updated = time.monotonic()
+                with self.lock:
+                    self.stats[host]["throttled"] += 1
+                return delay
+            if status_code < 400 and bucket.rate < max_rate:
+                bucket.rate = min(max_rate, bucket.rate + self.recover_step)
+        return 0.0
+
+    def current_rate(self, url):
+        host = urlsplit(url).hostname or url
+        return self.bucket(host).rate
@@ -0,0 +1,91 @@
+"""
+상품 보존 기간 관리
+상품마다 first_seen / last_seen(날짜)을 기록하고, 보존 기간 동안 목록에 나오지 않은 상품은
+아카이브 저장소(SQLite)로 옮겨 매 실행마다 불러오는 상품 목록 크기를 일정하게 유지합니다.
+아카이브된 상품이 다시 목록에 나오면 되살려서 재입고 감지가 그대로 동작하게 합니다.
+"""
+
+from datetime import date, timedelta
+
+
+class Retention:
+    """핫 상품 목록 ↔ 아카이브 이동"""
+
+    def __init__(self, archive, days):
+        self.archive = archive
+        self.days = days
+        self.archived = 0
+        self.recalled = 0
+        self._restored = []
+
+    def touch(self, old, prod, today):
+        """이번 사이클에 본 상품 레코드 (first_seen 유지, last_seen 갱신)"""
+        first_seen = (old.first_seen if old is not None else None) or prod.first_seen or today
+        return prod.replace(first_seen=first_seen, last_seen=today)
+
+    def recall(self, site, site_saved, product_ids):
+        """핫 목록에 없는 상품을 아카이브에서 되살림 (재입고 감지용), 되살린 개수 반환"""
+        count = 0
+        for pid in product_ids:
+            if pid in site_saved:
+                continue
+            record = self.archive.get(site, pid)
+            if record is not None:
+                site_saved[pid] = record
+                self._restored.append((site, pid))
+                count += 1
+        self.recalled += count
+        return count
+
+    def evict(self, saved_products, today):
+        """보존 기간이 지난 상품을 아카이브로 이동 (하루 한 번, 마지막 실행 날짜는 아카이브 DB에 기록)
+
+        last_seen이 없는 기존 상품은 오늘 날짜로 표시만 합니다.
+        SQLite 저장소(SiteProducts)는 전체를 훑지 않고 last_seen 인덱스로 해당 상품만 조회합니다.
+        반환값: (아카이브한 개수, 날짜를 표시한 개수)
+        """
+        if self.archive.get_meta("evicted_on") == today:
+            return 0, 0
+        cutoff = (date.fromisoformat(today) - timedelta(days=self.days)).isoformat()
+        archived = stamped = 0
+
+        for site, site_saved in saved_products.items():
+            if hasattr(site_saved, "stale_ids"):
+                unstamped, stale_ids = site_saved.unstamped_ids(), site_saved.stale_ids(cutoff)
+            else:
+                unstamped = [pid for pid, record in site_saved.items() if record.last_seen is None]
+                stale_ids = [
+                    pid for pid, record in site_saved.items()
+                    if record.last_seen is not None and record.last_seen < cutoff
+                ]
+
+            for pid in unstamped:
+                site_saved[pid] = site_saved[pid].replace(last_seen=today)
+            stamped += len(unstamped)
+
+            if stale_ids:
+                # 아카이브에 먼저 쓰고 핫 목록에서 제거 (중간에 실패해도 상품이 사라지지 않음)
+                self.archive.upsert(site, {pid: site_saved[pid] for pid in stale_ids})
+                for pid in stale_ids:
+                    del site_saved[pid]
+                archived += len(stale_ids)
+
+        self.archive.set_meta("evicted_on", today)
+        self.archived += archived
+        return archived, stamped
+
+    def commit(self):
+        """핫 목록이 저장된 뒤 호출 - 되살린 상품을 아카이브에서 삭제"""
+        by_site = {}
+        for site, pid in self._restored:
+            by_site.setdefault(site, []).append(pid)
+        for site, pids in by_site.items():
+            self.archive.delete(site, pids)
+        self._restored = []
+
+    def summary(self):
+        return f"아카이브 {self.archived} / 복원 {self.recalled}"
+
+    def reset(self):
+        self.archived = 0
+        self.recalled = 0
@@ -0,0 +1,136 @@
+"""
+뷰별 적응형 폴링 간격
+정렬/페이지(뷰)마다 조회할 때 나온 신상품·재입고·가격 변경 이벤트 수를 기록해 초당 이벤트 발생률(지수 이동 평균)을 구하고,
+전체 요청량(모든 뷰를 base_interval마다 한 번 조회하는 양)은 그대로 둔 채 발생률에 비례해 조회 횟수를 나눠 줍니다.
+이벤트가 자주 나오는 뷰는 min_interval까지 자주, 거의 안 나오는 뷰는 max_interval까지 드물게 조회합니다.
+상태는 JSON 파일로 저장해 실행 간에 유지합니다.
+꺼져 있으면(enabled=False) 모든 뷰를 매번 조회하고 상태도 갱신하지 않습니다.
+"""
+
+import json
+import os
+import threading
+import time
+
+# base_interval이 0 이하로 설정됐을 때 쓰는 값(초) - 데몬 기본 주기
+DEFAULT_BASE_INTERVAL = 90.0
+
+
+class ViewScheduler:
+    """뷰별 이벤트 발생률 → 조회 간격"""
+
+    def __init__(self, path, base_interval, min_interval, max_interval, alpha=0.3, enabled=True):
+        self.path = path
+        if base_interval <= 0:
+            print(f"[뷰 스케줄] 기본 조회 간격 {base_interval:g}초는 사용할 수 없어 {DEFAULT_BASE_INTERVAL:g}초로 설정")
+            base_interval = DEFAULT_BASE_INTERVAL
+        self.base_interval = base_interval
+        self.min_interval = min_interval
+        self.max_interval = max(min_interval, max_interval)
+        self.alpha = alpha
+        self.enabled = enabled
+        self.lock = threading.Lock()
+        # {뷰: {"rate": 초당 이벤트 수, "interval": 조회 간격(초), "last": 마지막 조회 시각}}
+        self.entries = {}
+        # 이번 사이클에 조회한 뷰의 상품 ID / 이벤트 수
+        self._polled = {}
+        self._events = {}
+        self.skipped = 0
+        if path and os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    self.entries = json.load(f)
+            except (OSError, ValueError):
+                self.entries = {}
+
+    def due(self, view, now=None):
+        """이번 사이클에 조회할 차례인지 (처음 보는 뷰는 항상 조회)"""
+        if not self.enabled:
+            return True
+        now = time.time() if now is None else now
+        with self.lock:
+            entry = self.entries.get(view)
+            # 실행 시각이 조금씩 흔들려도 한 주기를 통째로 건너뛰지 않도록 10% 여유
+            if entry is None or now - entry["last"] >= entry["interval"] * 0.9:
+                return True
+            self.skipped += 1
+            return False
+
+    def observe(self, view, product_ids):
+        """이번 사이클에 조회한 뷰와 그 뷰에 나온 상품 ID 기록"""
+        with self.lock:
+            self._polled[view] = set(product_ids)
+
+    def credit(self, site, product_ids):
+        """이벤트가 난 상품을 그 상품이 나온 뷰들의 이벤트로 집계"""
+        prefix = f"{site}:"
+        with self.lock:
+            views = [(view, ids) for view, ids in self._polled.items() if view.startswith(prefix)]
+            for pid in product_ids:
+                for view, ids in views:
+                    if pid in ids:
+                        self._events[view] = self._events.get(view, 0) + 1
+
+    def commit(self, now=None):
+        """이번 사이클 조회 결과로 발생률을 갱신하고 뷰별 간격 재배분 (꺼져 있으면 기록만 비움)"""
+        now = time.time() if now is None else now
+        with self.lock:
+            if not self.enabled:
+                self._polled = {}
+                self._events = {}
+                return
+            for view in self._polled:
+                events = self._events.get(view, 0)
+                entry = self.entries.get(view)
+                if entry is None:
+                    self.entries[view] = {"rate": events / self.base_interval, "interval": self.base_interval, "last": now}
+                    continue
+                elapsed = max(now - entry["last"], self.min_interval, 1.0)
+                entry["rate"] = (1 - self.alpha) * entry["rate"] + self.alpha * events / elapsed
+                entry["last"] = now
+            self._polled = {}
+            self._events = {}
+            self._reallocate()
+
+    def _reallocate(self):
+        """전체 조회량(뷰 수 / base_interval)을 발생률에 비례해 나눔 (간격은 min~max 범위로 제한)"""
+        if not self.entries:
+            return
+        total_rate = sum(entry["rate"] for entry in self.entries.values())
+        # 이벤트가 없던 뷰도 조금은 몫을 받도록 평균 발생률의 10%를 기본값으로 더함
+        floor = total_rate / len(self.entries) * 0.1 or 1.0
+        weights = {view: entry["rate"] + floor for view, entry in self.entries.items()}
+        total_weight = sum(weights.values())
+        budget = len(self.entries) / self.base_interval
+        for view, entry in self.entries.items():
+            interval = total_weight / (budget * weights[view])
+            entry["interval"] = min(self.max_interval, max(self.min_interval, interval))
+
+    def until_next(self, now=None):
+        """다음으로 조회할 뷰까지 남은 시간(초) - 뷰가 없으면 None"""
+        now = time.time() if now is None else now
+        with self.lock:
+            if not self.enabled or not self.entries:
+                return None
+            return max(0.0, min(entry["last"] + entry["interval"] * 0.9 for entry in self.entries.values()) - now)
+
+    def save(self):
+        """임시 파일에 쓴 뒤 교체"""
+        if not self.path:
+            return
+        with self.lock:
+            data = dict(self.entries)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def summary(self):
+        with self.lock:
+            intervals = ", ".join(
+                f"{view} {entry['interval']:.0f}초" for view, entry in sorted(self.entries.items())
+            )
+            return f"{intervals} (건너뜀 {self.skipped})"
+
+    def reset(self):
+        self.skipped = 0
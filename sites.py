@@ -0,0 +1,146 @@
+"""
+사이트 어댑터 + 동시 실행기
+사이트마다 조회 함수(정렬/페이지 조회 → 파싱 → {상품 ID: 상품})와 파서를 SiteAdapter로 등록하고,
+SiteScheduler가 모든 사이트를 동시에 실행해 사이클 시간이 가장 느린 사이트 하나에 맞춰지게 합니다.
+사이트마다 시간 예산이 있어 예산을 넘긴 사이트는 이번 사이클 결과에서 빠지고 취소 플래그가 켜집니다
+(조회 함수는 뷰 사이마다 확인해 중단). 아직 끝나지 않은 이전 조회가 있으면 같은 사이트를 겹쳐 실행하지 않고,
+사이클 상태를 저장하기 전과 종료할 때 wait_idle()로 남은 조회가 끝나길 기다립니다.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError, wait
+
+
+class SiteAdapter:
+    """사이트 한 곳의 조회 방법
+
+    fetch(pool, site_saved, cancel) → {상품 ID: 상품} (실패하거나 cancel이 켜져 중단하면 None)
+    parse(html, backend=None, scoped=True) → {상품 ID: 상품} (저장된 페이지 검증용)
+    """
+
+    def __init__(self, key, name, fetch, parse=None, budget=None, max_inflight=1):
+        self.key = key
+        self.name = name
+        self.fetch = fetch
+        self.parse = parse
+        self.budget = budget
+        self.max_inflight = max_inflight
+        self._slots = threading.BoundedSemaphore(max_inflight)
+        self.elapsed = None
+
+    def _run(self, pool, site_saved, cancel):
+        started = time.time()
+        try:
+            return self.fetch(pool, site_saved, cancel)
+        finally:
+            self.elapsed = time.time() - started
+            self._slots.release()
+
+
+class SiteScheduler:
+    """등록된 사이트를 동시에 조회 (사이트별 시간 예산 + 동시 실행 수 제한)"""
+
+    def __init__(self):
+        self.adapters = {}
+        self._executor = None
+        # 예산을 넘겨 아직 실행 중인 조회 {사이트: (future, 취소 플래그)}
+        self._overrun = {}
+        self.stats = {"timeout": 0, "skipped": 0, "failed": 0}
+
+    def register(self, adapter):
+        self.adapters[adapter.key] = adapter
+        return adapter
+
+    def __getitem__(self, key):
+        return self.adapters[key]
+
+    def __contains__(self, key):
+        return key in self.adapters
+
+    def check(self, sites):
+        """SITES에 있는데 어댑터가 없는 사이트가 있으면 ValueError"""
+        missing = [key for key in sites if key not in self.adapters]
+        if missing:
+            raise ValueError(f"조회 어댑터가 등록되지 않은 사이트: {', '.join(missing)}")
+
+    @property
+    def executor(self):
+        """처음 사용할 때 생성 (예산을 넘긴 조회가 끝날 때까지 기다리지 않도록 사이클마다 새로 만들지 않음)"""
+        if self._executor is None:
+            workers = sum(adapter.max_inflight for adapter in self.adapters.values())
+            self._executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="site")
+        return self._executor
+
+    def run(self, pool, saved_products):
+        """모든 사이트 동시 조회 → {사이트: {상품 ID: 상품}} (실패/예산 초과 사이트는 빠짐)"""
+        started = time.time()
+        futures = {}
+        cancels = {}
+        for key, adapter in self.adapters.items():
+            if not adapter._slots.acquire(blocking=False):
+                print(f"[{adapter.name}] 이전 조회가 아직 끝나지 않아 이번 사이클은 건너뜀")
+                self.stats["skipped"] += 1
+                continue
+            adapter.elapsed = None
+            cancels[key] = threading.Event()
+            try:
+                futures[key] = self.executor.submit(adapter._run, pool, saved_products.get(key, {}), cancels[key])
+            except Exception:
+                adapter._slots.release()
+                raise
+
+        results = {}
+        for key, future in futures.items():
+            adapter = self.adapters[key]
+            timeout = None
+            if adapter.budget is not None:
+                timeout = max(0.0, started + adapter.budget - time.time())
+            try:
+                products = future.result(timeout=timeout)
+            except TimeoutError:
+                # 조회 함수가 다음 뷰로 넘어가기 전에 멈추도록 취소 (끝날 때까지 이 사이트는 새로 조회하지 않음)
+                cancels[key].set()
+                self._overrun[key] = (future, cancels[key])
+                print(f"[{adapter.name}] 시간 예산 {adapter.budget:g}초 초과 - 조회 취소, 이번 사이클 결과에서 제외")
+                self.stats["timeout"] += 1
+                continue
+            except Exception as e:
+                print(f"[{adapter.name}] 조회 실패: {e}")
+                self.stats["failed"] += 1
+                continue
+            if products:
+                results[key] = products
+        return results
+
+    def wait_idle(self, timeout=None):
+        """예산을 넘긴 조회가 끝날 때까지 대기 → 아직 끝나지 않은 사이트 수"""
+        self._overrun = {key: entry for key, entry in self._overrun.items() if not entry[0].done()}
+        if not self._overrun:
+            return 0
+        _, not_done = wait([future for future, _ in self._overrun.values()], timeout=timeout)
+        for key, (future, _) in self._overrun.items():
+            if future in not_done:
+                print(f"[{self.adapters[key].name}] 취소한 조회가 {timeout:g}초 안에 끝나지 않음")
+        return len(not_done)
+
+    def summary(self):
+        timings = ", ".join(
+            f"{adapter.name} {adapter.elapsed:.1f}초"
+            for adapter in self.adapters.values() if adapter.elapsed is not None
+        )
+        labels = {"timeout": "예산 초과", "skipped": "건너뜀", "failed": "실패"}
+        stats = ", ".join(f"{labels[name]} {count}" for name, count in self.stats.items() if count)
+        return timings + (f" ({stats})" if stats else "")
+
+    def reset(self):
+        self.stats = {name: 0 for name in self.stats}
+
+    def close(self, timeout=None):
+        """실행 중인 조회를 모두 취소하고 timeout초까지 기다린 뒤 종료"""
+        for _, cancel in self._overrun.values():
+            cancel.set()
+        self.wait_idle(timeout)
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
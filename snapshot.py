@@ -0,0 +1,99 @@
+"""
+상품 목록 스냅샷 파일 (JSON / gzip JSON / msgpack / msgpack+zstd)
+저장은 임시 파일에 쓰고 fsync한 뒤 교체하므로 중간에 죽어도 기존 파일이 깨지지 않습니다.
+불러올 때는 파일 앞부분으로 형식을 판별하므로 기존 products.json도 그대로 읽습니다.
+msgpack / zstandard는 설치되어 있을 때만 사용할 수 있습니다.
+"""
+
+import gzip
+import json
+import os
+import tempfile
+
+_GZIP_MAGIC = b"\x1f\x8b"
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+# 형식 이름 = 파일 확장자
+FORMATS = ["json", "json.gz", "msgpack", "msgpack.zst"]
+
+ZSTD_LEVEL = 3
+
+
+def _msgpack():
+    import msgpack
+
+    return msgpack
+
+
+def _zstd():
+    import zstandard
+
+    return zstandard
+
+
+def is_available(fmt):
+    try:
+        if fmt.startswith("msgpack"):
+            _msgpack()
+        if fmt.endswith(".zst"):
+            _zstd()
+        return fmt in FORMATS
+    except ImportError:
+        return False
+
+
+def available_formats():
+    return [fmt for fmt in FORMATS if is_available(fmt)]
+
+
+def path_for(json_path, fmt):
+    """products.json → products.<형식>"""
+    return f"{os.path.splitext(json_path)[0]}.{fmt}"
+
+
+def dumps(data, fmt):
+    if fmt == "json":
+        return json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8")
+    if fmt == "json.gz":
+        return gzip.compress(json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8"), 6)
+    if fmt == "msgpack":
+        return _msgpack().packb(data, use_bin_type=True)
+    if fmt == "msgpack.zst":
+        return _zstd().ZstdCompressor(level=ZSTD_LEVEL).compress(_msgpack().packb(data, use_bin_type=True))
+    raise ValueError(f"알 수 없는 스냅샷 형식: {fmt}")
+
+
+def loads(raw):
+    """내용으로 형식을 판별해 복원"""
+    if raw.startswith(_ZSTD_MAGIC):
+        return _msgpack().unpackb(_zstd().ZstdDecompressor().decompress(raw), raw=False)
+    if raw.startswith(_GZIP_MAGIC):
+        return json.loads(gzip.decompress(raw).decode("utf-8"))
+    if raw.lstrip()[:1] in (b"{", b"["):
+        return json.loads(raw.decode("utf-8"))
+    return _msgpack().unpackb(raw, raw=False)
+
+
+def write_atomic(path, raw):
+    """같은 디렉터리의 임시 파일에 쓰고 fsync 후 교체"""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=os.path.basename(path) + ".", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(raw)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def save(path, data, fmt="json"):
+    write_atomic(path, dumps(data, fmt))
+
+
+def load(path):
+    with open(path, "rb") as f:
+        return loads(f.read())
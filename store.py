@@ -0,0 +1,259 @@
+"""
+SQLite 상품 저장소
+(사이트, 상품 ID)를 기본 키로 상품 레코드를 저장하고 품절 여부와 last_seen에 인덱스를 둡니다.
+사이트별 상품은 dict처럼 쓰는 SiteProducts로 불러오며, 필요한 상품만 조회하고
+바뀐 상품만 upsert하므로 불러오기/저장 비용이 전체 이력 크기가 아니라 변경량에 비례합니다.
+기존 products.json 가져오기/내보내기를 지원합니다.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections.abc import MutableMapping
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS products (
+    site TEXT NOT NULL,
+    product_id TEXT NOT NULL,
+    data TEXT NOT NULL,
+    soldout INTEGER NOT NULL DEFAULT 0,
+    updated REAL NOT NULL,
+    last_seen TEXT,
+    PRIMARY KEY (site, product_id)
+);
+CREATE INDEX IF NOT EXISTS products_soldout ON products (site, soldout);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+class SiteProducts(MutableMapping):
+    """한 사이트의 상품 {상품 ID: 레코드} - 조회한 상품은 메모리에 캐시, 변경분은 save()까지 보관"""
+
+    def __init__(self, store, site):
+        self.store = store
+        self.site = site
+        self._cache = {}
+        self._dirty = set()
+
+    def __getitem__(self, product_id):
+        if product_id not in self._cache:
+            record = self.store.get(self.site, product_id)
+            if record is None:
+                raise KeyError(product_id)
+            self._cache[product_id] = record
+        return self._cache[product_id]
+
+    def __contains__(self, product_id):
+        try:
+            self[product_id]
+            return True
+        except KeyError:
+            return False
+
+    def __setitem__(self, product_id, record):
+        self._cache[product_id] = record
+        self._dirty.add(product_id)
+
+    def __delitem__(self, product_id):
+        self[product_id]
+        del self._cache[product_id]
+        self._dirty.discard(product_id)
+        self.store.delete(self.site, [product_id])
+
+    def __iter__(self):
+        # 아직 저장하지 않은 새 상품도 포함
+        ids = self.store.ids(self.site)
+        yield from ids
+        seen = set(ids)
+        yield from (pid for pid in list(self._dirty) if pid not in seen)
+
+    def __len__(self):
+        return self.store.count(self.site) + sum(
+            1 for pid in self._dirty if self.store.get(self.site, pid) is None
+        )
+
+    def __bool__(self):
+        return bool(self._dirty) or self.store.count(self.site) > 0
+
+    def _last_seen(self, product_id):
+        record = self._cache[product_id]
+        return record.last_seen if hasattr(record, "last_seen") else record.get("last_seen")
+
+    def stale_ids(self, cutoff):
+        """last_seen이 cutoff보다 이전인 상품 ID (저장하지 않은 변경분 반영)"""
+        ids = [pid for pid in self.store.stale_ids(self.site, cutoff) if pid not in self._dirty]
+        return ids + [pid for pid in self._dirty if (self._last_seen(pid) or cutoff) < cutoff]
+
+    def unstamped_ids(self):
+        """last_seen이 없는 상품 ID (저장하지 않은 변경분 반영)"""
+        ids = [pid for pid in self.store.unstamped_ids(self.site) if pid not in self._dirty]
+        return ids + [pid for pid in self._dirty if self._last_seen(pid) is None]
+
+    def take_dirty(self):
+        """저장할 변경분을 꺼내고 변경 표시 해제"""
+        dirty = {pid: self._cache[pid] for pid in self._dirty}
+        self._dirty.clear()
+        return dirty
+
+
+class ProductStore:
+    """상품 저장소 (SQLite)"""
+
+    def __init__(self, path, decode=None):
+        self.path = path
+        # decode(site, dict) → 레코드 객체 (없으면 dict 그대로)
+        self.decode = decode
+        self.lock = threading.Lock()
+        self._conn = None
+
+    @property
+    def conn(self):
+        """처음 사용할 때 DB 열기 (lock을 잡은 상태에서 호출)"""
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            # 캐시에는 .db 파일만 저장되므로 WAL 대신 기본 롤백 저널 (커밋하면 바로 .db에 반영, 예전 WAL 파일도 정리)
+            self._conn.execute("PRAGMA journal_mode=DELETE")
+            self._conn.executescript(_SCHEMA)
+            columns = [row[1] for row in self._conn.execute("PRAGMA table_info(products)")]
+            if "last_seen" not in columns:
+                # last_seen 열이 없던 예전 DB는 레코드에서 채움
+                with self._conn:
+                    self._conn.execute("ALTER TABLE products ADD COLUMN last_seen TEXT")
+                    self._conn.execute("UPDATE products SET last_seen = json_extract(data, '$.last_seen')")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS products_last_seen ON products (site, last_seen)")
+        return self._conn
+
+    def get(self, site, product_id):
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT data FROM products WHERE site = ? AND product_id = ?", (site, str(product_id))
+            ).fetchone()
+        if not row:
+            return None
+        data = json.loads(row[0])
+        return self.decode(site, data) if self.decode else data
+
+    def ids(self, site):
+        with self.lock:
+            return [row[0] for row in self.conn.execute("SELECT product_id FROM products WHERE site = ?", (site,))]
+
+    def count(self, site):
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM products WHERE site = ?", (site,)).fetchone()[0]
+
+    def soldout_ids(self, site):
+        """품절 상태로 저장된 상품 ID (soldout 인덱스 사용)"""
+        with self.lock:
+            return [
+                row[0]
+                for row in self.conn.execute("SELECT product_id FROM products WHERE site = ? AND soldout = 1", (site,))
+            ]
+
+    def stale_ids(self, site, cutoff):
+        """last_seen이 cutoff(YYYY-MM-DD)보다 이전인 상품 ID (last_seen 인덱스 사용)"""
+        with self.lock:
+            return [
+                row[0]
+                for row in self.conn.execute(
+                    "SELECT product_id FROM products WHERE site = ? AND last_seen < ?", (site, cutoff)
+                )
+            ]
+
+    def unstamped_ids(self, site):
+        """last_seen이 없는 상품 ID"""
+        with self.lock:
+            return [
+                row[0]
+                for row in self.conn.execute(
+                    "SELECT product_id FROM products WHERE site = ? AND last_seen IS NULL", (site,)
+                )
+            ]
+
+    def get_meta(self, key):
+        with self.lock:
+            row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key, value):
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT INTO meta (key, value) VALUES (?, ?) ON CONFLICT (key) DO UPDATE SET value = excluded.value",
+                (key, value),
+            )
+
+    def upsert(self, site, records):
+        """상품 레코드 추가/갱신, 처리한 개수 반환"""
+        now = time.time()
+        rows = []
+        for pid, record in records.items():
+            data = record.to_dict() if hasattr(record, "to_dict") else record
+            rows.append((
+                site, str(pid), json.dumps(data, ensure_ascii=False), int(bool(data.get("soldout"))), now,
+                data.get("last_seen"),
+            ))
+        with self.lock, self.conn:
+            self.conn.executemany(
+                "INSERT INTO products (site, product_id, data, soldout, updated, last_seen) VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (site, product_id) DO UPDATE SET "
+                "data = excluded.data, soldout = excluded.soldout, updated = excluded.updated, "
+                "last_seen = excluded.last_seen",
+                rows,
+            )
+        return len(rows)
+
+    def delete(self, site, product_ids):
+        with self.lock, self.conn:
+            self.conn.executemany(
+                "DELETE FROM products WHERE site = ? AND product_id = ?", [(site, str(pid)) for pid in product_ids]
+            )
+
+    def is_empty(self):
+        with self.lock:
+            return self.conn.execute("SELECT 1 FROM products LIMIT 1").fetchone() is None
+
+    def load(self, sites):
+        """사이트별 SiteProducts (실제 조회는 필요할 때)"""
+        return {site: SiteProducts(self, site) for site in sites}
+
+    def save(self, saved_products):
+        """변경된 상품만 저장, 저장한 개수 반환 (일반 dict는 전체 저장)"""
+        total = 0
+        for site, products in saved_products.items():
+            records = products.take_dirty() if isinstance(products, SiteProducts) else products
+            if records:
+                total += self.upsert(site, records)
+        return total
+
+    def import_data(self, data):
+        """{사이트: {상품 ID: 레코드}} 가져오기, 가져온 상품 수 반환"""
+        return sum(self.upsert(site, products) for site, products in data.items())
+
+    def import_json(self, path):
+        """products.json 형식 파일 가져오기"""
+        with open(path, "r", encoding="utf-8") as f:
+            return self.import_data(json.load(f))
+
+    def export_json(self, path, sites=None):
+        """products.json 형식으로 내보내기 (임시 파일에 쓴 뒤 교체)"""
+        with self.lock:
+            rows = self.conn.execute("SELECT site, product_id, data FROM products ORDER BY site, rowid").fetchall()
+        data = {site: {} for site in (sites or [])}
+        for site, product_id, record in rows:
+            data.setdefault(site, {})[product_id] = json.loads(record)
+
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+        return sum(len(products) for products in data.values())
+
+    def close(self):
+        with self.lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None